@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+UserModel = get_user_model()
+
+# Bounds how long another process can serve a user changed elsewhere, in case
+# the session cache is not shared.
+USER_CACHE_TIMEOUT = 5 * 60
+
+
+def _user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def _user_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def forget_users(user_ids):
+    """Drop cached users, so that the next request reads them again."""
+    _user_cache().delete_many([_user_key(user_id) for user_id in user_ids])
+
+
+class BrigadeModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` loading the user's brigade with the user, in one query,
+    and keeping both next to the sessions so that most requests need none.
+    """
+
+    def get_user(self, user_id):
+        user = _user_cache().get(_user_key(user_id))
+        if user is None:
+            try:
+                user = UserModel._default_manager.select_related("brigade").get(
+                    pk=user_id
+                )
+            except UserModel.DoesNotExist:
+                return None
+            _user_cache().set(_user_key(user_id), user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        user = await _user_cache().aget(_user_key(user_id))
+        if user is None:
+            try:
+                user = await UserModel._default_manager.select_related(
+                    "brigade"
+                ).aget(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            await _user_cache().aset(_user_key(user_id), user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
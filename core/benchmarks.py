@@ -0,0 +1,667 @@
+"""
+Performance benchmarks for the timesheet hot paths.
+
+Run with ``python manage.py benchmark [name ...]``. Every benchmark runs against
+a throwaway test database and returns a dict of measurements in milliseconds.
+"""
+
+import asyncio
+import gzip
+import io
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import OperationalError, connection, connections
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from core.models import ArchivedMonth, Brigade, TimeSheet, User, Worker
+from core.timesheets import (
+    build_month_grid,
+    month_entries,
+    month_range,
+    monthly_totals,
+    save_monthly_hours,
+)
+
+BENCHMARKS = {}
+
+# Keys of the measurements compared against a baseline, see ``regressions()``.
+BASELINE_KEYS = ("median_ms", "total_ms")
+
+# name: (brigades, workers per brigade, years of history) for ``hot_paths``.
+SCALES = {
+    "small": (4, 10, 1),
+    "medium": (10, 20, 2),
+    "large": (20, 30, 3),
+}
+
+# table_body.html as it was before the rows were precomputed in the view: one
+# {% include %} and two get_item lookups per cell.
+LEGACY_TABLE_BODY = """{% load dict_filters %}
+{% for worker in workers %}
+<tr>
+    <td>{{ worker.first_name }} {{ worker.last_name }}</td>
+    {% for day in days %}
+        {% with worker_hours_dict=hours_map|get_item:worker.id %}
+            {% if worker_hours_dict %}
+                {% with hours=worker_hours_dict|get_item:day|default:"-" %}
+                    {% include "partials/timesheet_cell.html" with worker_id=worker.id %}
+                {% endwith %}
+            {% else %}
+                {% with hours="-" %}
+                    {% include "partials/timesheet_cell.html" with worker_id=worker.id %}
+                {% endwith %}
+            {% endif %}
+        {% endwith %}
+    {% endfor %}
+</tr>
+{% empty %}
+<tr>
+    <td colspan="{{ days|length|add:1 }}">Brak pracowników w tej brygadzie.</td>
+</tr>
+{% endfor %}
+"""
+
+
+# table_body.html before the cells were made compact: every cell reversed its
+# own save URL and repeated its class and style.
+PER_CELL_URL_TABLE_BODY = """{% for row in rows %}
+<tr data-worker-id="{{ row.worker.id }}">
+    <td>{{ row.worker.first_name }} {{ row.worker.last_name }}</td>
+    {% for day, hours in row.cells %}
+    <td id="cell-{{ row.worker.id }}-{{ day }}"
+  data-save-url="{% url 'save_hours' worker_id=row.worker.id %}" data-hours="{{ hours|default_if_none:'' }}"
+  class="text-center" style="cursor: pointer;">
+  {{ hours|default:"-" }}
+</td>
+    {% endfor %}
+</tr>
+{% empty %}
+<tr>
+    <td colspan="{{ days|length|add:1 }}">Brak pracowników w tej brygadzie.</td>
+</tr>
+{% endfor %}
+"""
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def measure(func, repeat=20):
+    """Call ``func`` ``repeat`` times and return the best and median time in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "best_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+    }
+
+
+def seed_brigade(name, worker_count, year, month, days, hours=8):
+    """Create a brigade, its foreman and ``worker_count`` workers with hours on ``days``."""
+    brigade = Brigade.objects.create(name=name)
+    foreman = User.objects.create_user(
+        username=f"{name}-brygadzista", role=User.Role.BRYGADZISTA, brigade=brigade
+    )
+    workers = Worker.objects.bulk_create(
+        Worker(first_name=f"Imie{i:03d}", last_name=f"Nazwisko{i:03d}")
+        for i in range(worker_count)
+    )
+    brigade.workers.add(*workers)
+    TimeSheet.objects.bulk_create(
+        TimeSheet(worker=worker, date=date(year, month, day), hours_worked=hours)
+        for worker in workers
+        for day in days
+    )
+    return foreman
+
+
+def seed_history(workers, start, end, hours=8, batch_size=5000):
+    """Give every worker ``hours`` on each weekday in ``[start, end)``."""
+    entries = []
+    day = start
+    while day < end:
+        if day.weekday() < 5:
+            entries.extend(
+                TimeSheet(worker=worker, date=day, hours_worked=hours)
+                for worker in workers
+            )
+            if len(entries) >= batch_size:
+                TimeSheet.objects.bulk_create(entries)
+                entries = []
+        day += timedelta(days=1)
+    TimeSheet.objects.bulk_create(entries)
+
+
+def seed_load(brigades, workers, years, end=None, prefix="load"):
+    """
+    Create ``brigades`` brigades of ``workers`` workers, each with a foreman,
+    and ``years`` years of weekday hours up to the month before ``end``
+    (default: up to the current month). Fills the ``MonthlyHours`` rollup too.
+
+    Returns the foremen.
+    """
+    if end is None:
+        end = month_range(date.today().year, date.today().month)[1]
+    foremen = [
+        seed_brigade(f"{prefix}{i:03d}", workers, end.year, end.month, [])
+        for i in range(brigades)
+    ]
+    load_workers = list(
+        Worker.objects.filter(brigade__in=[foreman.brigade for foreman in foremen])
+    )
+    seed_history(load_workers, end.replace(year=end.year - years), end)
+    save_monthly_hours(
+        monthly_totals(TimeSheet.objects.filter(worker__in=load_workers)).iterator(
+            chunk_size=2000
+        ),
+        batch_size=2000,
+    )
+    return foremen
+
+
+def regressions(results, baseline, tolerance, path=""):
+    """
+    Compare ``results`` with a ``baseline`` of the same shape.
+
+    Returns ``(path, baseline, result)`` for every ``BASELINE_KEYS`` timing that
+    is more than ``tolerance`` (a fraction) slower than in the baseline.
+    Measurements missing from the baseline are not compared.
+    """
+    found = []
+    for key, value in results.items():
+        if key not in baseline:
+            continue
+        if isinstance(value, dict):
+            found += regressions(value, baseline[key], tolerance, f"{path}{key}.")
+        elif key in BASELINE_KEYS and value > baseline[key] * (1 + tolerance):
+            found.append((f"{path}{key}", baseline[key], value))
+    return found
+
+
+def _rendered(render):
+    """``measure()`` of ``render`` plus the size of its output, raw and gzipped."""
+    html = render().encode()
+    return {
+        **measure(render),
+        "bytes": len(html),
+        "gzip_bytes": len(gzip.compress(html)),
+    }
+
+
+@benchmark
+def table_render():
+    """
+    Render the table body of a full 40 x 31 grid: legacy template, the one with
+    a save URL per cell and the current compact one, with their response sizes.
+    """
+    foreman = seed_brigade("bench-table", 40, 2025, 7, range(1, 32))
+    workers = list(foreman.brigade.workers.order_by("last_name", "first_name"))
+    rows, hours_map = build_month_grid(workers, 2025, 7, 31)
+    context = {
+        "workers": workers,
+        "rows": rows,
+        "hours_map": hours_map,
+        "days": list(range(1, 32)),
+        "current_year": 2025,
+        "current_month": 7,
+    }
+    legacy = engines["django"].from_string(LEGACY_TABLE_BODY)
+    per_cell_url = engines["django"].from_string(PER_CELL_URL_TABLE_BODY)
+
+    return {
+        "legacy": _rendered(lambda: legacy.render(context)),
+        "per_cell_url": _rendered(lambda: per_cell_url.render(context)),
+        "current": _rendered(
+            lambda: render_to_string("partials/table_body.html", context)
+        ),
+    }
+
+
+@benchmark
+def month_scan():
+    """
+    Month reads as history grows: 300 workers, one to three years of weekdays.
+
+    Reports the query plans, which must stay index-only, and the read times of
+    one brigade's grid and of a month across all workers.
+    """
+    foreman = seed_brigade("bench-scan", 40, 2025, 12, [])
+    brigade_workers = list(foreman.brigade.workers.all())
+    workers = brigade_workers + Worker.objects.bulk_create(
+        Worker(first_name="Imie", last_name=f"Historia{i:03d}") for i in range(260)
+    )
+
+    start, end = month_range(2025, 12)
+    grid = month_entries([worker.id for worker in brigade_workers], 2025, 12)
+    all_workers = (
+        TimeSheet.objects.filter(date__gte=start, date__lt=end)
+        .order_by()
+        .values_list("worker_id", "hours_worked")
+    )
+
+    results = {}
+    for years in (1, 2, 3):
+        seed_history(workers, date(2026 - years, 1, 1), date(2027 - years, 1, 1))
+        results[f"{years}y"] = {
+            "rows": TimeSheet.objects.count(),
+            "grid": measure(lambda: list(grid.all())),
+            "grid_plan": grid.explain(),
+            "all_workers": measure(lambda: list(all_workers.all())),
+            "all_workers_plan": all_workers.explain(),
+        }
+    return results
+
+
+@benchmark
+def timesheet_import():
+    """Import about 100k day entries (400 workers x 12 months of weekdays) from CSV."""
+    from core.exports import HEADER, csv_lines
+    from core.imports import import_timesheets
+
+    workers = Worker.objects.bulk_create(
+        Worker(first_name="Import", last_name=f"Pracownik{i:03d}") for i in range(400)
+    )
+    rows = [HEADER]
+    for worker in workers:
+        for month in range(1, 13):
+            row = ["", str(worker), 2025, month]
+            for day in range(1, 32):
+                try:
+                    weekday = date(2025, month, day).weekday()
+                except ValueError:
+                    weekday = 6
+                row.append(8 if weekday < 5 else "")
+            rows.append(row)
+    content = "".join(csv_lines(rows))
+
+    start = time.perf_counter()
+    saved, rejected = import_timesheets(content.splitlines())
+    return {
+        "entries": saved,
+        "rejected": len(rejected),
+        "total_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+@benchmark
+def concurrent_saves(writers=8, saves=60):
+    """
+    ``writers`` foremen saving cells at the same time, ``saves`` each.
+
+    Every foreman runs in its own thread with its own connection and posts to
+    ``save_hours`` like the grid does. Any "database is locked" error is counted;
+    with the production SQLite profile there must be none.
+    """
+    foremen = [seed_brigade(f"bench-writer{i}", 4, 2025, 7, []) for i in range(writers)]
+    barrier = threading.Barrier(writers)
+    errors, timings = [], []
+
+    # Logged in here, so that a thread failing before the barrier cannot leave
+    # the others waiting for good.
+    def writer(foreman):
+        client = Client()
+        client.force_login(foreman)
+        return client, list(foreman.brigade.workers.values_list("id", flat=True))
+
+    def write(client, workers):
+        try:
+            barrier.wait()
+            for i in range(saves):
+                url = reverse("save_hours", args=[workers[i % len(workers)]])
+                data = {"date": f"2025-07-{i // len(workers) + 1:02d}", "hours": "8"}
+                start = time.perf_counter()
+                try:
+                    client.post(url, data)
+                except OperationalError as exc:
+                    errors.append(str(exc))
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=write, args=writer(f)) for f in foremen]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "journal_mode": connection.cursor()
+        .execute("PRAGMA journal_mode")
+        .fetchone()[0],
+        "saves": len(timings),
+        "saved": TimeSheet.objects.count(),
+        "lock_errors": len(errors),
+        "total_ms": round(total_ms, 3),
+        "median_save_ms": round(statistics.median(timings), 3),
+        "max_save_ms": round(max(timings), 3),
+    }
+
+
+def _htmx_session(foreman, year, month, count):
+    """Headers and ``count`` HTMX requests of a foreman: three cell saves per table load."""
+    client = Client()
+    client.force_login(foreman)
+    csrf_token = get_random_string(32)
+    headers = {
+        "Host": "testserver",
+        "Cookie": f"{settings.SESSION_COOKIE_NAME}="
+        f"{client.cookies[settings.SESSION_COOKIE_NAME].value}; "
+        f"{settings.CSRF_COOKIE_NAME}={csrf_token}",
+        "X-CSRFToken": csrf_token,
+        "HX-Request": "true",
+    }
+    worker_ids = list(foreman.brigade.workers.values_list("id", flat=True))
+    table = reverse("dashboard_by_date", args=[year, month])
+    requests = []
+    for i in range(count):
+        if i % 4 == 3:
+            requests.append(("GET", table, b""))
+        else:
+            worker_id = worker_ids[i % len(worker_ids)]
+            body = urlencode(
+                {"date": f"{year}-{month:02d}-{i % 28 + 1:02d}", "hours": i % 9}
+            )
+            requests.append(
+                ("POST", reverse("save_hours", args=[worker_id]), body.encode())
+            )
+    return headers, requests
+
+
+def _wsgi_request(app, headers, method, path, body):
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "CONTENT_TYPE": "application/x-www-form-urlencoded",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    for name, value in headers.items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+    setup_testing_defaults(environ)
+    status = []
+    response = app(environ, lambda code, response_headers: status.append(code))
+    b"".join(response)
+    response.close()
+    return int(status[0].split()[0])
+
+
+async def _asgi_request(app, headers, method, path, body):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/x-www-form-urlencoded"),
+            *(
+                (name.lower().encode(), value.encode())
+                for name, value in headers.items()
+            ),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # The client never disconnects; the handler cancels this wait.
+        await asyncio.Event().wait()
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+def _load_result(statuses, total_ms):
+    return {
+        "requests": len(statuses),
+        "errors": sum(1 for status in statuses if status != 200),
+        "total_ms": round(total_ms, 3),
+        "requests_per_s": round(len(statuses) / total_ms * 1000, 1),
+    }
+
+
+@benchmark
+def htmx_load(users=16, requests=60):
+    """
+    Concurrent HTMX traffic through the WSGI and the ASGI application.
+
+    ``users`` foremen of separate brigades each send ``requests`` requests, three
+    ``save_hours`` posts for every table reload, one after another. Under WSGI
+    every user gets a thread, as with a threaded server; under ASGI all users
+    share one event loop. Both handlers run in process, without a server.
+    """
+    foremen = [seed_brigade(f"bench-load{i}", 10, 2025, 7, []) for i in range(users)]
+
+    wsgi = get_wsgi_application()
+    sessions = [_htmx_session(foreman, 2025, 7, requests) for foreman in foremen]
+
+    def wsgi_user(session):
+        headers, user_requests = session
+        try:
+            return [_wsgi_request(wsgi, headers, *request) for request in user_requests]
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        wsgi_statuses = [
+            status for result in pool.map(wsgi_user, sessions) for status in result
+        ]
+    wsgi_ms = (time.perf_counter() - start) * 1000
+
+    asgi = get_asgi_application()
+    sessions = [_htmx_session(foreman, 2025, 8, requests) for foreman in foremen]
+
+    async def asgi_user(session):
+        headers, user_requests = session
+        return [
+            await _asgi_request(asgi, headers, *request) for request in user_requests
+        ]
+
+    async def asgi_users():
+        return await asyncio.gather(*(asgi_user(session) for session in sessions))
+
+    start = time.perf_counter()
+    asgi_statuses = [
+        status for result in asyncio.run(asgi_users()) for status in result
+    ]
+    asgi_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "wsgi": _load_result(wsgi_statuses, wsgi_ms),
+        "asgi": _load_result(asgi_statuses, asgi_ms),
+    }
+
+
+@benchmark
+def hot_paths():
+    """
+    The timesheet hot paths at each of ``SCALES``.
+
+    Every scale adds its brigades and history to the database and is measured
+    on one of its own brigades, in the last full month: the table context with
+    a cold and a warm cache, rendering of ``table_body.html``, ``save_hours``,
+    ``bulk_save_hours`` over the whole month and both report views.
+    """
+    from core.views import _get_timesheet_context
+
+    boss = User.objects.create_user(username="bench-szef", role=User.Role.SZEF)
+    boss_client = Client()
+    boss_client.force_login(boss)
+    get_context = async_to_sync(_get_timesheet_context)
+
+    results = {}
+    for scale, (brigades, workers, years) in SCALES.items():
+        end = date(2025, 7, 1)
+        foreman = seed_load(brigades, workers, years, end, prefix=f"bench-{scale}")[0]
+        year, month = 2025, 6
+        num_days = 30
+
+        client = Client()
+        client.force_login(foreman)
+        worker_id = foreman.brigade.workers.values_list("id", flat=True)[0]
+        save_url = reverse("save_hours", args=[worker_id])
+        bulk_url = reverse("bulk_save_hours", args=[year, month])
+        rows, _ = build_month_grid(
+            foreman.brigade.workers.order_by("last_name", "first_name"),
+            year,
+            month,
+            num_days,
+        )
+        table_context = {
+            "rows": rows,
+            "days": list(range(1, num_days + 1)),
+            "current_year": year,
+            "current_month": month,
+        }
+
+        def cold_context():
+            cache.clear()
+            get_context(foreman, date(year, month, 1))
+
+        hours = iter(range(10**6))
+        report = {"year": year, "month": month}
+        results[scale] = {
+            "rows": TimeSheet.objects.count(),
+            "timesheet_context_cold": measure(cold_context, repeat=10),
+            "timesheet_context_warm": measure(
+                lambda: get_context(foreman, date(year, month, 1))
+            ),
+            "table_body": measure(
+                lambda: render_to_string("partials/table_body.html", table_context)
+            ),
+            "save_hours": measure(
+                lambda: client.post(
+                    save_url, {"date": "2025-06-02", "hours": next(hours) % 9}
+                )
+            ),
+            "bulk_save_hours": measure(
+                lambda: client.post(
+                    bulk_url,
+                    {
+                        "day": 1,
+                        "day_to": num_days,
+                        "hours_1": next(hours) % 9,
+                        "mode": "overwrite",
+                    },
+                    HTTP_HX_REQUEST="true",
+                ),
+                repeat=10,
+            ),
+            "report_brigade_summary": measure(
+                lambda: boss_client.get(reverse("report_brigade_summary"), report)
+            ),
+            "report_worker_payroll": measure(
+                lambda: boss_client.get(reverse("report_worker_payroll"), report)
+            ),
+        }
+    return results
+
+
+@benchmark
+def archive_scan():
+    """
+    Reads of old months before and after ``archive_months`` packs them:
+    300 workers with three years of weekdays, a 40 worker brigade's grid of a
+    past month and a CSV export of a whole past year.
+    """
+    from core.exports import csv_lines, timesheet_rows
+
+    foreman = seed_brigade("bench-archive", 40, 2025, 12, [])
+    brigade_workers = list(foreman.brigade.workers.order_by("last_name", "first_name"))
+    workers = brigade_workers + Worker.objects.bulk_create(
+        Worker(first_name="Imie", last_name=f"Archiwum{i:03d}") for i in range(260)
+    )
+    seed_history(workers, date(2023, 1, 1), date(2026, 1, 1))
+
+    def grid():
+        build_month_grid(brigade_workers, 2024, 3, 31)
+
+    def export():
+        for _ in csv_lines(timesheet_rows(date(2024, 1, 1), date(2025, 1, 1))):
+            pass
+
+    results = {}
+    for stage in ("live", "archived"):
+        if stage == "archived":
+            start = time.perf_counter()
+            call_command("archive_months", "--before", "2026-01", stdout=io.StringIO())
+            results["archive_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        results[stage] = {
+            "timesheet_rows": TimeSheet.objects.count(),
+            "archived_rows": ArchivedMonth.objects.count(),
+            "grid": measure(grid),
+            "export_year": measure(export, repeat=3),
+        }
+    return results
+
+
+@benchmark
+def session_overhead():
+    """
+    Queries and time of one ``save_hours`` with database sessions and an
+    uncached user (the former setup) vs the configured cached sessions.
+    """
+    from core.backends import forget_users
+
+    foreman = seed_brigade("bench-session", 10, 2025, 7, [])
+    worker_id = foreman.brigade.workers.values_list("id", flat=True)[0]
+    url = reverse("save_hours", args=[worker_id])
+    hours = iter(range(10**6))
+
+    def save(client, uncached_user):
+        if uncached_user:
+            forget_users([foreman.pk])
+        client.post(url, {"date": "2025-07-02", "hours": next(hours) % 9})
+
+    def run(uncached_user):
+        client = Client()
+        client.force_login(foreman)
+        save(client, uncached_user)
+        with CaptureQueriesContext(connection) as queries:
+            save(client, uncached_user)
+        return {
+            "queries": len(queries),
+            **measure(lambda: save(client, uncached_user)),
+        }
+
+    with override_settings(SESSION_ENGINE="django.contrib.sessions.backends.db"):
+        database = run(uncached_user=True)
+    return {"db_sessions": database, "cached_sessions": run(uncached_user=False)}
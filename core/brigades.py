@@ -0,0 +1,46 @@
+"""
+Brigade membership changes in bulk.
+
+At the start of a season hundreds of workers move between brigades at once, so
+membership is changed as one diff on the ``Worker.brigade`` through table
+instead of one ``add()``/``remove()`` per worker. Bulk writes to the through
+table do not send ``m2m_changed``, the cached tables are invalidated here.
+"""
+
+from django.db import transaction
+
+from core.cache import invalidate_brigades
+from core.models import Worker
+
+
+def change_brigade_workers(brigade_id, add=(), remove=()):
+    """
+    Add the ``add`` and remove the ``remove`` worker ids from the brigade.
+
+    Ids of unknown workers, workers already in the brigade and ids present in
+    both lists are skipped. Returns ``(added, removed)`` counts.
+    """
+    through = Worker.brigade.through
+    remove = set(remove)
+    add = set(add) - remove
+
+    with transaction.atomic():
+        new_ids = []
+        if add:
+            new_ids = list(
+                Worker.objects.filter(pk__in=add)
+                .exclude(brigade=brigade_id)
+                .values_list("pk", flat=True)
+            )
+            through.objects.bulk_create(
+                through(brigade_id=brigade_id, worker_id=worker_id)
+                for worker_id in new_ids
+            )
+        removed = 0
+        if remove:
+            removed, _ = through.objects.filter(
+                brigade_id=brigade_id, worker_id__in=remove
+            ).delete()
+        if new_ids or removed:
+            transaction.on_commit(lambda: invalidate_brigades([brigade_id]))
+    return len(new_ids), removed
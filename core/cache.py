@@ -0,0 +1,151 @@
+"""
+Cache of rendered timesheet tables.
+
+Entries are keyed by brigade, year and month plus two counters: a per-brigade
+generation, bumped when the brigade's membership or its workers change, and a
+per-month version, bumped on every timesheet write in that month. The ordered
+worker ids of a brigade are cached under the same generation. Bumping a
+counter orphans the old entry instead of deleting it, so a table rendered
+concurrently with a write is never served after the write.
+
+The counters only work when every worker process uses the same cache; see
+``core.checks``.
+"""
+
+import time
+
+from django.core.cache import cache
+
+from core.models import Worker
+
+TABLE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _generation_key(brigade_id):
+    return f"timesheet:generation:{brigade_id}"
+
+
+def _version_key(brigade_id, year, month):
+    return f"timesheet:version:{brigade_id}:{year}:{month}"
+
+
+def _seed_counter(key):
+    # Seeded from the clock so that an evicted counter never repeats an old value.
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def _bump_counter(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        _seed_counter(key)
+
+
+def table_version(brigade_id, year, month):
+    """
+    ``"<generation>:<version>"`` of a brigade's month; it changes whenever the
+    month's table does, so it also serves as a validator for conditional GETs.
+    """
+    keys = [_generation_key(brigade_id), _version_key(brigade_id, year, month)]
+    counters = cache.get_many(keys)
+    generation, version = (
+        counters[key] if key in counters else _seed_counter(key) for key in keys
+    )
+    return f"{generation}:{version}"
+
+
+def _table_key(brigade_id, year, month):
+    version = table_version(brigade_id, year, month)
+    return f"timesheet:table:{brigade_id}:{year}:{month}:{version}"
+
+
+def cached_table(brigade_id, year, month, build):
+    """Return the cached table of a brigade's month, calling ``build()`` on a miss."""
+    key = _table_key(brigade_id, year, month)
+    table = cache.get(key)
+    if table is None:
+        table = build()
+        cache.set(key, table, TABLE_TIMEOUT)
+    return table
+
+
+async def _aseed_counter(key):
+    await cache.aadd(key, time.time_ns(), timeout=None)
+    return await cache.aget(key)
+
+
+async def atable_version(brigade_id, year, month):
+    """Async version of ``table_version``."""
+    keys = [_generation_key(brigade_id), _version_key(brigade_id, year, month)]
+    counters = await cache.aget_many(keys)
+    generation, version = [
+        counters[key] if key in counters else await _aseed_counter(key) for key in keys
+    ]
+    return f"{generation}:{version}"
+
+
+async def _atable_key(brigade_id, year, month):
+    version = await atable_version(brigade_id, year, month)
+    return f"timesheet:table:{brigade_id}:{year}:{month}:{version}"
+
+
+async def acached_table(brigade_id, year, month, build):
+    """Async version of ``cached_table``, awaiting the ``build()`` coroutine on a miss."""
+    key = await _atable_key(brigade_id, year, month)
+    table = await cache.aget(key)
+    if table is None:
+        table = await build()
+        await cache.aset(key, table, TABLE_TIMEOUT)
+    return table
+
+
+def _workers_key(brigade_id, generation):
+    return f"brigade:workers:{brigade_id}:{generation}"
+
+
+def _worker_ids(brigade_id):
+    return (
+        Worker.objects.filter(brigade=brigade_id)
+        .order_by("last_name", "first_name")
+        .values_list("id", flat=True)
+    )
+
+
+def brigade_worker_ids(brigade_id):
+    """Ids of the brigade's workers in table order, cached until the brigade changes."""
+    generation = cache.get(_generation_key(brigade_id))
+    if generation is None:
+        generation = _seed_counter(_generation_key(brigade_id))
+    key = _workers_key(brigade_id, generation)
+    worker_ids = cache.get(key)
+    if worker_ids is None:
+        worker_ids = list(_worker_ids(brigade_id))
+        cache.set(key, worker_ids, TABLE_TIMEOUT)
+    return worker_ids
+
+
+async def abrigade_worker_ids(brigade_id):
+    """Async version of ``brigade_worker_ids``."""
+    generation = await cache.aget(_generation_key(brigade_id))
+    if generation is None:
+        generation = await _aseed_counter(_generation_key(brigade_id))
+    key = _workers_key(brigade_id, generation)
+    worker_ids = await cache.aget(key)
+    if worker_ids is None:
+        worker_ids = [worker_id async for worker_id in _worker_ids(brigade_id)]
+        await cache.aset(key, worker_ids, TABLE_TIMEOUT)
+    return worker_ids
+
+
+def invalidate_months(brigade_ids, months):
+    """Drop the cached tables of ``months`` (``(year, month)`` pairs) of the brigades."""
+    for brigade_id in brigade_ids:
+        for year, month in months:
+            _bump_counter(_version_key(brigade_id, year, month))
+
+
+def invalidate_brigades(brigade_ids):
+    """Drop every cached table of the brigades."""
+    for brigade_id in brigade_ids:
+        _bump_counter(_generation_key(brigade_id))
@@ -0,0 +1,56 @@
+"""
+System checks.
+
+The table cache versions, the cached tables and the cached sessions and users
+are only correct when every worker process sees the same cache: with a
+per-process cache a write bumps the version of the process that handled it,
+and the others keep answering 304 and serving their stale tables. This is
+reported by ``manage.py check --deploy``.
+
+Outside DEBUG the vendored static files must be present, as pages no longer
+fall back to the CDN; ``collectstatic`` refuses to run without them.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from core.staticfiles import VENDOR_ASSETS, is_vendored
+
+PROCESS_LOCAL_CACHES = {"django.core.cache.backends.locmem.LocMemCache"}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    uses = {
+        "default": "timesheet tables",
+        settings.SESSION_CACHE_ALIAS: "sessions and logged-in users",
+    }
+    return [
+        Warning(
+            f"The '{alias}' cache ({uses[alias]}) is local to each process.",
+            hint=(
+                "With more than one worker process, configure a cache shared by "
+                "all of them, such as Redis or Memcached."
+            ),
+            obj=alias,
+            id="core.W001",
+        )
+        for alias in uses
+        if settings.CACHES.get(alias, {}).get("BACKEND") in PROCESS_LOCAL_CACHES
+    ]
+
+
+@register(Tags.staticfiles)
+def check_vendored_assets(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+    return [
+        Error(
+            f"{path} is not vendored.",
+            hint="Run manage.py vendor_assets.",
+            obj=path,
+            id="core.E001",
+        )
+        for path in VENDOR_ASSETS
+        if not is_vendored(path)
+    ]
@@ -0,0 +1,129 @@
+"""
+Live updates of open timesheet grids.
+
+Every brigade and month has a channel. After a save commits, the changed cells
+are rendered as out-of-band ``timesheet_cell`` fragments and published on the
+channels of the workers' brigades; the grids listen on a server-sent events
+stream (``timesheet_events``) and swap the fragments in, so they stay current
+without reloading the table or polling.
+
+Messages go through the broker named by ``TIMESHEET_EVENTS_BROKER``. The
+default ``InProcessBroker`` only reaches streams served by the same process;
+with several ASGI workers it has to be replaced by a broker with the same
+``publish``/``subscribe`` methods backed by a shared server.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from functools import cache
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from core.models import Worker
+
+# Seconds between comments sent on an idle stream, so that dropped clients are noticed.
+KEEPALIVE_SECONDS = 25
+
+
+class InProcessBroker:
+    """Publish/subscribe between the threads and event loops of one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, message):
+        """Queue ``message`` for every subscriber of ``channel``; safe from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    def subscribe(self, channel):
+        """Async context manager: a queue receiving ``channel`` messages while open."""
+        return _Subscription(self, channel)
+
+
+class _Subscription:
+    def __init__(self, broker, channel):
+        self.broker, self.channel = broker, channel
+
+    async def __aenter__(self):
+        self.subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.broker._lock:
+            self.broker._subscribers[self.channel].add(self.subscriber)
+        return self.subscriber[1]
+
+    async def __aexit__(self, *exc_info):
+        subscribers = self.broker._subscribers
+        with self.broker._lock:
+            subscribers[self.channel].discard(self.subscriber)
+            if not subscribers[self.channel]:
+                del subscribers[self.channel]
+
+
+@cache
+def get_broker():
+    return import_string(
+        getattr(settings, "TIMESHEET_EVENTS_BROKER", "core.events.InProcessBroker")
+    )()
+
+
+def timesheet_channel(brigade_id, year, month):
+    return f"timesheet:{brigade_id}:{year}-{month:02d}"
+
+
+def _publish(cells, memberships, year, month):
+    by_brigade = defaultdict(set)
+    for worker_id, brigade_id in memberships:
+        by_brigade[brigade_id].add(worker_id)
+    broker = get_broker()
+    for brigade_id, worker_ids in by_brigade.items():
+        context = {
+            "cells": sorted(cell for cell in cells if cell[0] in worker_ids),
+            "current_year": year,
+            "current_month": month,
+        }
+        broker.publish(
+            timesheet_channel(brigade_id, year, month),
+            render_to_string("partials/batch_save_response.html", context),
+        )
+
+
+def _memberships(cells):
+    return Worker.brigade.through.objects.filter(
+        worker_id__in={worker_id for worker_id, _, _ in cells}
+    ).values_list("worker_id", "brigade_id")
+
+
+def publish_cells(cells, year, month):
+    """
+    Send the ``(worker_id, day, hours)`` cells of the month to the open grids of
+    the workers' brigades. Call it once the changes are committed.
+    """
+    if cells:
+        _publish(cells, list(_memberships(cells)), year, month)
+
+
+async def apublish_cells(cells, year, month):
+    if cells:
+        _publish(cells, [row async for row in _memberships(cells)], year, month)
+
+
+async def event_stream(channel):
+    """Server-sent events of ``channel``: each message as one ``cells`` event."""
+    async with get_broker().subscribe(channel) as queue:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            data = "".join(
+                f"data: {line}\n" for line in message.splitlines() if line.strip()
+            )
+            yield f"event: cells\n{data}\n"
@@ -0,0 +1,158 @@
+"""
+Streaming export of monthly timesheets.
+
+Each row is one worker's month in one brigade, with an empty brigade for
+workers without one: the hours of every day followed by the same days worked
+and total hours as the payroll report. Rows are built from ordered queries of
+the live and the archived entries, read with ``iterator()`` and merged, so
+memory use does not depend on the size of the export.
+"""
+
+import csv
+import heapq
+from itertools import groupby
+from operator import itemgetter
+
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+
+from core.models import ArchivedMonth, TimeSheet
+from core.timesheets import unpack_month
+
+EXPORT_CHUNK_SIZE = 2000
+
+HEADER = [
+    "Brygada",
+    "Pracownik",
+    "Rok",
+    "Miesiąc",
+    *(str(day) for day in range(1, 32)),
+    "Dni przepracowane",
+    "Suma godzin",
+]
+
+
+def timesheet_rows(start=None, end=None, brigade_id=None):
+    """
+    Yield the header and then one row per brigade, worker and month.
+
+    ``start``/``end`` bound the dates as a half-open range, ``brigade_id``
+    limits the export to one brigade. Archived months are merged in, with live
+    entries winning over archived days.
+    """
+    yield HEADER
+    months = heapq.merge(
+        _archived_months(start, end, brigade_id),
+        _live_months(start, end, brigade_id),
+        key=itemgetter(0),
+    )
+    for key, parts in groupby(months, key=itemgetter(0)):
+        brigade, last_name, first_name, _, year, month = key
+        days = {}
+        for _, part in parts:
+            days.update(part)
+        hours = [days.get(day, "") for day in range(1, 32)]
+        yield _finish([brigade, f"{first_name} {last_name}", year, month, *hours])
+
+
+def _brigade_name():
+    # Workers without a brigade are exported with an empty one. Not NULL, which
+    # would not compare with the names when the two queries are merged.
+    return Coalesce("worker__brigade__name", Value(""))
+
+
+def _live_months(start, end, brigade_id):
+    """``(sort key, {day: hours})`` per brigade, worker and month, in key order."""
+    entries = TimeSheet.objects.all()
+    if start:
+        entries = entries.filter(date__gte=start)
+    if end:
+        entries = entries.filter(date__lt=end)
+    if brigade_id:
+        entries = entries.filter(worker__brigade=brigade_id)
+    entries = (
+        entries.annotate(brigade_name=_brigade_name())
+        .order_by(
+            "brigade_name",
+            "worker__last_name",
+            "worker__first_name",
+            "worker_id",
+            "date",
+        )
+        .values_list(
+            "brigade_name",
+            "worker__last_name",
+            "worker__first_name",
+            "worker_id",
+            "date",
+            "hours_worked",
+        )
+    )
+
+    key, days = None, None
+    for brigade, last_name, first_name, worker_id, day, hours in entries.iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    ):
+        entry_key = (brigade, last_name, first_name, worker_id, day.year, day.month)
+        if entry_key != key:
+            if days:
+                yield key, days
+            key, days = entry_key, {}
+        days[day.day] = hours
+    if days:
+        yield key, days
+
+
+def _archived_months(start, end, brigade_id):
+    """Same as ``_live_months`` for the ``ArchivedMonth`` rows."""
+    archived = ArchivedMonth.objects.all()
+    if start:
+        archived = archived.filter(
+            Q(year__gt=start.year) | Q(year=start.year, month__gte=start.month)
+        )
+    if end:
+        archived = archived.filter(
+            Q(year__lt=end.year) | Q(year=end.year, month__lt=end.month)
+        )
+    if brigade_id:
+        archived = archived.filter(worker__brigade=brigade_id)
+    archived = (
+        archived.annotate(brigade_name=_brigade_name())
+        .order_by(
+            "brigade_name",
+            "worker__last_name",
+            "worker__first_name",
+            "worker_id",
+            "year",
+            "month",
+        )
+        .values_list(
+            "brigade_name",
+            "worker__last_name",
+            "worker__first_name",
+            "worker_id",
+            "year",
+            "month",
+            "hours",
+        )
+    )
+    for *key, packed in archived.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield tuple(key), unpack_month(packed)
+
+
+def _finish(row):
+    hours = [value for value in row[4:] if value != ""]
+    return row + [sum(1 for value in hours if value > 0), sum(hours)]
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for streaming ``csv``."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,143 @@
+"""
+Bulk import of monthly timesheets from CSV.
+
+The accepted layout is the one written by ``core.exports``: a worker's name,
+year and month followed by one column per day; other columns (brigade, totals)
+are ignored. Rows are validated into a staging dict first and only then
+written in chunked upserts inside one transaction.
+"""
+
+import calendar
+import csv
+from datetime import date
+
+from django.db import transaction
+
+from core.models import PayrollPeriod, TimeSheet, Worker
+from core.signals import timesheets_changed
+
+IMPORT_CHUNK_SIZE = 2000
+MAX_HOURS = 24
+
+
+def _name_key(name):
+    return " ".join(name.split()).casefold()
+
+
+def worker_lookup():
+    """Map normalized worker names to ids; ambiguous names map to ``None``."""
+    lookup = {}
+    for worker_id, first_name, last_name in Worker.objects.values_list(
+        "id", "first_name", "last_name"
+    ):
+        key = _name_key(f"{first_name} {last_name}")
+        lookup[key] = None if key in lookup else worker_id
+    return lookup
+
+
+def locked_months():
+    """``is_locked(worker_id, year, month)`` for the closed ``PayrollPeriod`` months."""
+    everyone, by_brigade = set(), {}
+    for year, month, brigade_id in PayrollPeriod.objects.values_list(
+        "year", "month", "brigade_id"
+    ):
+        if brigade_id is None:
+            everyone.add((year, month))
+        else:
+            by_brigade.setdefault(brigade_id, set()).add((year, month))
+
+    by_worker = {}
+    if by_brigade:
+        for worker_id, brigade_id in Worker.brigade.through.objects.filter(
+            brigade_id__in=by_brigade
+        ).values_list("worker_id", "brigade_id"):
+            by_worker.setdefault(worker_id, set()).update(by_brigade[brigade_id])
+
+    def is_locked(worker_id, year, month):
+        return (year, month) in everyone or (year, month) in by_worker.get(
+            worker_id, ()
+        )
+
+    return is_locked
+
+
+def stage_rows(lines, workers, is_locked=None):
+    """
+    Validate CSV ``lines`` against the ``workers`` lookup; rows of months for
+    which ``is_locked(worker_id, year, month)`` is true are rejected.
+
+    Returns ``(staged, rejected)``: ``{(worker_id, date): hours}`` for the valid
+    rows, and ``(line number, reason)`` pairs for the rejected ones. Blank day
+    cells are skipped; a row with any invalid cell is rejected as a whole.
+    """
+    staged, rejected = {}, []
+    reader = csv.DictReader(lines)
+    for row in reader:
+        line = reader.line_num
+        worker_id = workers.get(_name_key(row.get("Pracownik") or ""), 0)
+        if worker_id == 0:
+            rejected.append((line, "Nieznany pracownik"))
+            continue
+        if worker_id is None:
+            rejected.append((line, "Niejednoznaczny pracownik"))
+            continue
+        try:
+            year, month = int(row["Rok"]), int(row["Miesiąc"])
+            # date() also rejects years outside 1-9999, monthrange() does not.
+            date(year, month, 1)
+            num_days = calendar.monthrange(year, month)[1]
+        except (KeyError, TypeError, ValueError, calendar.IllegalMonthError):
+            rejected.append((line, "Nieprawidłowy rok lub miesiąc"))
+            continue
+        if is_locked and is_locked(worker_id, year, month):
+            rejected.append((line, "Miesiąc zamknięty"))
+            continue
+
+        cells, error = {}, None
+        for day in range(1, 32):
+            value = (row.get(str(day)) or "").strip()
+            if not value:
+                continue
+            if day > num_days:
+                error = f"Dzień {day} poza miesiącem"
+                break
+            # isdigit() alone also accepts digits such as "²" that int() rejects.
+            if not (value.isascii() and value.isdigit()) or int(value) > MAX_HOURS:
+                error = f"Nieprawidłowe godziny w dniu {day}"
+                break
+            cells[worker_id, date(year, month, day)] = int(value)
+        if error:
+            rejected.append((line, error))
+        else:
+            staged.update(cells)
+    return staged, rejected
+
+
+def apply_staged(staged, chunk_size=IMPORT_CHUNK_SIZE):
+    """Upsert the staged entries in chunks inside a single transaction."""
+    entries = [
+        TimeSheet(worker_id=worker_id, date=entry_date, hours_worked=hours)
+        for (worker_id, entry_date), hours in staged.items()
+    ]
+    with transaction.atomic():
+        for i in range(0, len(entries), chunk_size):
+            TimeSheet.objects.bulk_create(
+                entries[i : i + chunk_size],
+                update_conflicts=True,
+                unique_fields=["worker", "date"],
+                update_fields=["hours_worked"],
+            )
+        if entries:
+            timesheets_changed.send(
+                sender=TimeSheet,
+                worker_ids={worker_id for worker_id, _ in staged},
+                months={(day.year, day.month) for _, day in staged},
+            )
+    return len(entries)
+
+
+def import_timesheets(lines, dry_run=False):
+    """Stage and, unless ``dry_run``, save CSV ``lines``; returns ``(saved, rejected)``."""
+    staged, rejected = stage_rows(lines, worker_lookup(), locked_months())
+    saved = len(staged) if dry_run else apply_staged(staged)
+    return saved, rejected
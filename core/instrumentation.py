@@ -0,0 +1,109 @@
+"""
+Per-request performance measurements.
+
+``RequestTimingMiddleware`` opens a ``RequestStats`` for every request in a
+context variable, so that it follows the request into the threads that async
+views run the ORM in. Queries are counted by an execute wrapper installed on
+every new database connection (see ``core.signals``), template time by the
+``TimedDjangoTemplates`` backend. Finished requests are kept in a bounded,
+in-process window summarized by ``summarize()``.
+"""
+
+import statistics
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+_current = ContextVar("request_stats", default=None)
+
+# (kind, view name, total ms, queries, query ms, template ms) of recent requests.
+recent_requests = deque(maxlen=getattr(settings, "PERF_SUMMARY_SIZE", 500) or None)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_ms: float = 0.0
+    template_ms: float = 0.0
+    template_depth: int = 0
+
+
+def start_request():
+    """Start measuring the current request; returns the token for ``end_request``."""
+    return _current.set(RequestStats())
+
+
+def end_request(token):
+    stats = _current.get()
+    _current.reset(token)
+    return stats
+
+
+def record_query(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` adding the query to the current request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Only the outermost render counts, templates rendered inside are part of it.
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` whose templates add their render time to the request."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def summarize():
+    """Per view and request kind: count, latency percentiles and average costs."""
+    groups = {}
+    for kind, view, total_ms, queries, query_ms, template_ms in list(recent_requests):
+        groups.setdefault((view, kind), []).append(
+            (total_ms, queries, query_ms, template_ms)
+        )
+
+    rows = []
+    for (view, kind), timings in groups.items():
+        totals = sorted(timing[0] for timing in timings)
+        rows.append(
+            {
+                "view": view,
+                "kind": kind,
+                "count": len(timings),
+                "median_ms": statistics.median(totals),
+                "p95_ms": totals[int(0.95 * (len(totals) - 1))],
+                "max_ms": totals[-1],
+                "queries": statistics.mean(timing[1] for timing in timings),
+                "query_ms": statistics.mean(timing[2] for timing in timings),
+                "template_ms": statistics.mean(timing[3] for timing in timings),
+            }
+        )
+    return sorted(rows, key=lambda row: row["p95_ms"], reverse=True)
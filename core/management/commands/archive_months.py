@@ -0,0 +1,126 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import ArchivedMonth, TimeSheet
+from core.timesheets import (
+    NO_ENTRY,
+    month_range,
+    pack_month,
+    unpack_month,
+)
+
+
+def _month(value):
+    try:
+        year, month = value.split("-")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise CommandError(f"Expected a YYYY-MM month, got {value!r}.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Pack closed months into one ArchivedMonth row per worker and month, "
+        "or unpack them back into TimeSheet rows with --restore."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="Only months before this one (YYYY-MM, default: the current month).",
+        )
+        parser.add_argument(
+            "--restore",
+            action="store_true",
+            help="Unpack archived months back into daily TimeSheet rows.",
+        )
+
+    def handle(self, *args, **options):
+        before = date.today().replace(day=1)
+        if options["before"]:
+            requested = _month(options["before"])
+            if requested > before:
+                # See core.timesheets.can_be_archived.
+                raise CommandError("Only months before the current one are archived.")
+            before = requested
+
+        if options["restore"]:
+            self.restore(before)
+        else:
+            self.archive(before)
+
+    def archive(self, before):
+        months = TimeSheet.objects.filter(date__lt=before).dates("date", "month")
+        packed_rows = 0
+        for first_day in months:
+            with transaction.atomic():
+                packed_rows += self.archive_month(first_day.year, first_day.month)
+        self.stdout.write(
+            f"Packed {packed_rows} TimeSheet rows of {len(months)} months."
+        )
+
+    def archive_month(self, year, month):
+        start, end = month_range(year, month)
+        live = TimeSheet.objects.filter(date__gte=start, date__lt=end)
+
+        days = {}
+        for worker_id, day, hours in live.order_by().values_list(
+            "worker_id", "date__day", "hours_worked"
+        ):
+            days.setdefault(worker_id, {})[day] = hours
+        # Hours that do not fit in a byte stay live.
+        days = {
+            worker_id: hours_by_day
+            for worker_id, hours_by_day in days.items()
+            if max(hours_by_day.values()) < NO_ENTRY
+        }
+        for worker_id, packed in ArchivedMonth.objects.filter(
+            worker_id__in=days, year=year, month=month
+        ).values_list("worker_id", "hours"):
+            days[worker_id] = unpack_month(packed) | days[worker_id]
+
+        ArchivedMonth.objects.bulk_create(
+            [
+                ArchivedMonth(
+                    worker_id=worker_id,
+                    year=year,
+                    month=month,
+                    hours=pack_month(hours_by_day),
+                )
+                for worker_id, hours_by_day in days.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["worker", "year", "month"],
+            update_fields=["hours"],
+        )
+        # The hours themselves do not change, so the MonthlyHours rollup and the
+        # cached tables stay valid: delete without the per-row TimeSheet signals.
+        packed = live.filter(worker_id__in=days)
+        return packed._raw_delete(packed.db)
+
+    def restore(self, before):
+        archived = ArchivedMonth.objects.filter(
+            Q(year__lt=before.year) | Q(year=before.year, month__lt=before.month)
+        )
+        restored = 0
+        with transaction.atomic():
+            for archived_month in archived.iterator():
+                year, month = archived_month.year, archived_month.month
+                # Live entries added after archiving win over the archived ones.
+                TimeSheet.objects.bulk_create(
+                    [
+                        TimeSheet(
+                            worker_id=archived_month.worker_id,
+                            date=date(year, month, day),
+                            hours_worked=hours,
+                        )
+                        for day, hours in unpack_month(archived_month.hours).items()
+                    ],
+                    ignore_conflicts=True,
+                )
+                restored += 1
+            archived.delete()
+        self.stdout.write(f"Restored {restored} archived months.")
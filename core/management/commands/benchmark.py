@@ -0,0 +1,83 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmarks import BENCHMARKS, regressions
+
+
+class Command(BaseCommand):
+    help = "Run timesheet performance benchmarks against a throwaway test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help=f"Benchmarks to run (default: all). Available: {', '.join(BENCHMARKS)}",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON file with earlier results; fail if a timing regressed.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown against the baseline, as a fraction (default 0.25).",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store the results in the --baseline file instead of comparing.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or list(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        baseline_path = options["baseline"] and Path(options["baseline"])
+        if options["save_baseline"] and not baseline_path:
+            raise CommandError("--save-baseline needs a --baseline file.")
+        baseline = {}
+        if baseline_path and baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+        elif baseline_path and not options["save_baseline"]:
+            raise CommandError(f"Baseline {baseline_path} does not exist.")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # A file database, not SQLite's in-memory one, so that journaling
+            # and locking behave as in production.
+            if connection.vendor == "sqlite":
+                connection.settings_dict["TEST"]["NAME"] = str(Path(tmp, "bench.db"))
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            setup_test_environment()
+            try:
+                results = {name: BENCHMARKS[name]() for name in names}
+            finally:
+                teardown_test_environment()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+        if options["save_baseline"]:
+            # Benchmarks that did not run keep their earlier baseline.
+            baseline.update(results)
+            baseline_path.write_text(json.dumps(baseline, indent=2) + "\n")
+            self.stdout.write(
+                f"Saved baseline of {', '.join(names)} to {baseline_path}."
+            )
+        elif baseline_path:
+            found = regressions(results, baseline, options["tolerance"])
+            for path, before, after in found:
+                self.stderr.write(f"{path}: {before} ms -> {after} ms")
+            if found:
+                raise CommandError(
+                    f"{len(found)} timings regressed more than "
+                    f"{options['tolerance']:.0%} against {baseline_path}."
+                )
@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exports import csv_lines, timesheet_rows
+from core.timesheets import month_range
+
+
+def _month(value):
+    try:
+        year, month = value.split("-")
+        return int(year), int(month)
+    except ValueError:
+        raise CommandError(f"Expected a YYYY-MM month, got {value!r}.")
+
+
+class Command(BaseCommand):
+    help = "Export monthly timesheets of every brigade as CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First month to export (YYYY-MM).")
+        parser.add_argument("--end", help="Last month to export (YYYY-MM).")
+        parser.add_argument("--brigade", type=int, help="Only this brigade id.")
+        parser.add_argument("-o", "--output", help="Write to a file, not stdout.")
+
+    def handle(self, *args, **options):
+        start = date(*_month(options["start"]), 1) if options["start"] else None
+        end = month_range(*_month(options["end"]))[1] if options["end"] else None
+        lines = csv_lines(timesheet_rows(start, end, options["brigade"]))
+
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as f:
+                f.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
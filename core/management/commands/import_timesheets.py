@@ -0,0 +1,29 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import import_timesheets
+
+
+class Command(BaseCommand):
+    help = "Import monthly timesheets from a CSV file in the export layout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate the file, do not save anything.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as f:
+                saved, rejected = import_timesheets(f, dry_run=options["dry_run"])
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise CommandError(f"{options['path']} is not a UTF-8 CSV file: {e}")
+
+        for line, reason in rejected:
+            self.stderr.write(f"Wiersz {line}: {reason}")
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(f"{verb} {saved} entries, rejected {len(rejected)} rows.")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import ArchivedMonth, MonthlyHours, TimeSheet
+from core.timesheets import monthly_totals, refresh_monthly_hours, save_monthly_hours
+
+
+class Command(BaseCommand):
+    help = "Rebuild the MonthlyHours rollup from all TimeSheet and ArchivedMonth rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            MonthlyHours.objects.all().delete()
+            save_monthly_hours(
+                monthly_totals(TimeSheet.objects.all()).iterator(
+                    chunk_size=options["batch_size"]
+                ),
+                batch_size=options["batch_size"],
+            )
+            archived = ArchivedMonth.objects.order_by()
+            for year, month in archived.values_list("year", "month").distinct():
+                worker_ids = archived.filter(year=year, month=month).values_list(
+                    "worker_id", flat=True
+                )
+                refresh_monthly_hours(list(worker_ids), [(year, month)])
+        self.stdout.write(f"Rebuilt {MonthlyHours.objects.count()} monthly rows.")
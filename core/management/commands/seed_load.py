@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.benchmarks import seed_load
+from core.models import Brigade, TimeSheet
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic brigades, workers and years of timesheets for load "
+        "testing. Writes to the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--brigades", type=int, default=10)
+        parser.add_argument("--workers", type=int, default=20, help="Per brigade.")
+        parser.add_argument("--years", type=int, default=1)
+        parser.add_argument(
+            "--prefix", default="load", help="Prefix of the brigade names."
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if Brigade.objects.filter(name__startswith=prefix).exists():
+            raise CommandError(f"Brigades named {prefix}* already exist.")
+
+        before = TimeSheet.objects.count()
+        with transaction.atomic():
+            seed_load(
+                options["brigades"],
+                options["workers"],
+                options["years"],
+                prefix=prefix,
+            )
+        self.stdout.write(
+            f"Created {options['brigades']} brigades of {options['workers']} workers "
+            f"and {TimeSheet.objects.count() - before} timesheet entries."
+        )
@@ -0,0 +1,50 @@
+import base64
+import hashlib
+import re
+import urllib.request
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.staticfiles import VENDOR_ASSETS
+
+STATIC_DIR = Path(__file__).resolve().parents[2] / "static"
+
+# collectstatic rewrites source map references and fails on missing maps, which
+# are not vendored.
+SOURCE_MAP_RE = re.compile(rb"\n?/[*/]# sourceMappingURL=\S+(?: \*/)?\s*$")
+
+
+def _matches(content, integrity):
+    algorithm, _, expected = integrity.partition("-")
+    digest = hashlib.new(algorithm, content).digest()
+    return base64.b64encode(digest).decode() == expected
+
+
+class Command(BaseCommand):
+    help = "Download the pinned third-party static assets into core/static/vendor."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report the assets that are missing.",
+        )
+
+    def handle(self, *args, **options):
+        missing = [path for path in VENDOR_ASSETS if not (STATIC_DIR / path).exists()]
+        if options["check"]:
+            if missing:
+                raise CommandError(f"Not vendored: {', '.join(missing)}")
+            self.stdout.write("All assets are vendored.")
+            return
+
+        for path, (url, integrity) in VENDOR_ASSETS.items():
+            with urllib.request.urlopen(url, timeout=30) as response:
+                content = response.read()
+            if not _matches(content, integrity):
+                raise CommandError(f"{url} does not match its integrity hash.")
+            target = STATIC_DIR / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(SOURCE_MAP_RE.sub(b"\n", content))
+            self.stdout.write(f"{path}: {len(content)} bytes")
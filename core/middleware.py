@@ -0,0 +1,122 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponseNotFound
+
+from core.instrumentation import end_request, recent_requests, start_request
+from core.staticfiles import serve_static
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimingMiddleware:
+    """
+    Measure queries, template rendering and total latency of every request.
+
+    The numbers are sent back in a ``Server-Timing`` header, kept for the
+    performance summary page and logged when the request took longer than
+    ``PERF_SLOW_REQUEST_MS``. HTMX partial requests are tagged ``htmx``, full
+    page loads ``page``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start, token = time.perf_counter(), start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            stats = end_request(token)
+        self.finish(request, response, stats, start)
+        return response
+
+    async def __acall__(self, request):
+        start, token = time.perf_counter(), start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stats = end_request(token)
+        self.finish(request, response, stats, start)
+        return response
+
+    def finish(self, request, response, stats, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        kind = "htmx" if request.headers.get("HX-Request") == "true" else "page"
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={stats.query_ms:.1f};desc="{stats.queries} queries"',
+                f"tpl;dur={stats.template_ms:.1f}",
+                f'total;dur={total_ms:.1f};desc="{kind}"',
+            ]
+        )
+        if recent_requests.maxlen:
+            recent_requests.append(
+                (kind, view, total_ms, stats.queries, stats.query_ms, stats.template_ms)
+            )
+        if total_ms >= getattr(settings, "PERF_SLOW_REQUEST_MS", 500):
+            logger.warning(
+                "Slow %s request %s %s (%s): %.0f ms, %d queries in %.0f ms, "
+                "templates %.0f ms",
+                kind,
+                request.method,
+                request.path,
+                view,
+                total_ms,
+                stats.queries,
+                stats.query_ms,
+                stats.template_ms,
+            )
+
+
+class StaticFilesMiddleware:
+    """
+    Answer requests for ``STATIC_URL`` from ``STATIC_ROOT`` before sessions,
+    authentication and the rest of the stack run. Placed first, it is the
+    static file server of deployments without a separate web server.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.DEBUG:
+            # runserver serves the app's static directories itself.
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if request.path.startswith(self.prefix):
+            return self.serve(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path.startswith(self.prefix):
+            return self.serve(request)
+        return await self.get_response(request)
+
+    def serve(self, request):
+        try:
+            return serve_static(request, request.path.removeprefix(self.prefix))
+        except Http404:
+            return HttpResponseNotFound()
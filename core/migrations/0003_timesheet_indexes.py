@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_remove_worker_brigade_worker_brigade_timesheet"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="timesheet",
+            index=models.Index(
+                fields=["worker", "date", "hours_worked"],
+                name="ts_worker_date_hours_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timesheet",
+            index=models.Index(
+                fields=["date", "worker", "hours_worked"],
+                name="ts_date_worker_hours_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def build_monthly_hours(apps, schema_editor):
+    TimeSheet = apps.get_model('core', 'TimeSheet')
+    MonthlyHours = apps.get_model('core', 'MonthlyHours')
+    totals = (
+        TimeSheet.objects.order_by()
+        .values('worker_id', year=ExtractYear('date'), month=ExtractMonth('date'))
+        .annotate(
+            total_hours=Sum('hours_worked'),
+            days_worked=Count('id', filter=Q(hours_worked__gt=0)),
+        )
+    )
+    MonthlyHours.objects.bulk_create(
+        (MonthlyHours(**row) for row in totals.iterator(chunk_size=2000)),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_timesheet_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('total_hours', models.PositiveIntegerField(default=0)),
+                ('days_worked', models.PositiveSmallIntegerField(default=0)),
+                ('worker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.worker')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year', 'month'], name='monthly_hours_period_idx')],
+                'unique_together': {('worker', 'year', 'month')},
+            },
+        ),
+        migrations.RunPython(build_monthly_hours, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_monthly_hours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('hours', models.BinaryField(max_length=31)),
+                ('worker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.worker')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year', 'month'], name='archived_month_period_idx')],
+                'unique_together': {('worker', 'year', 'month')},
+            },
+        ),
+    ]
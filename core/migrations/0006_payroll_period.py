@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_archived_month'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('locked_at', models.DateTimeField(auto_now_add=True)),
+                ('brigade', models.ForeignKey(blank=True, help_text='Pusta: miesiąc zamknięty dla wszystkich brygad', null=True, on_delete=django.db.models.deletion.CASCADE, to='core.brigade')),
+                ('locked_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FrozenTimesheet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('html', models.TextField()),
+                ('brigade', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.brigade')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='core.payrollperiod')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='payrollperiod',
+            constraint=models.UniqueConstraint(fields=('year', 'month', 'brigade'), name='payroll_period_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='payrollperiod',
+            constraint=models.UniqueConstraint(condition=models.Q(('brigade__isnull', True)), fields=('year', 'month'), name='payroll_period_unique_all_brigades'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='frozentimesheet',
+            unique_together={('period', 'brigade')},
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:44
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_payroll_period'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(fields=['last_name', 'first_name'], name='worker_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(django.db.models.functions.comparison.Collate('last_name', 'NOCASE'), django.db.models.functions.comparison.Collate('first_name', 'NOCASE'), name='worker_name_search_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Collate
 
 # Create your models here.
 
@@ -39,6 +40,19 @@ class Worker(models.Model):
     last_name = models.CharField(max_length=50)
     brigade = models.ManyToManyField(Brigade, related_name="workers")
 
+    class Meta:
+        indexes = [
+            # Worker lists are ordered by name everywhere.
+            models.Index(fields=["last_name", "first_name"], name="worker_name_idx"),
+            # Case-insensitive prefix search (``istartswith`` is a LIKE in SQLite,
+            # which can only use an index with the NOCASE collation).
+            models.Index(
+                Collate("last_name", "NOCASE"),
+                Collate("first_name", "NOCASE"),
+                name="worker_name_search_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -53,6 +67,114 @@ class TimeSheet(models.Model):
     class Meta:
         unique_together = ("worker", "date")
         ordering = ["date", "worker"]
+        indexes = [
+            # Covers the month grid: worker__in plus a date range, hours included.
+            models.Index(
+                fields=["worker", "date", "hours_worked"],
+                name="ts_worker_date_hours_idx",
+            ),
+            # Date range scans across all workers (reports, exports).
+            models.Index(
+                fields=["date", "worker", "hours_worked"],
+                name="ts_date_worker_hours_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.worker} - {self.date}: {self.hours_worked} godz."
+
+
+class MonthlyHours(models.Model):
+    """Miesięczne podsumowanie godzin pracownika, utrzymywane przy każdym zapisie."""
+
+    worker = models.ForeignKey(Worker, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    total_hours = models.PositiveIntegerField(default=0)
+    days_worked = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("worker", "year", "month")
+        indexes = [
+            models.Index(fields=["year", "month"], name="monthly_hours_period_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.worker} - {self.month:02d}.{self.year}: {self.total_hours} godz."
+
+
+class ArchivedMonth(models.Model):
+    """
+    Zamknięty miesiąc pracownika spakowany w jeden wiersz zamiast jednego
+    wiersza TimeSheet na dzień: bajt ``hours[dzień - 1]`` to godziny danego dnia,
+    255 oznacza brak wpisu (zob. ``core.timesheets.pack_month``).
+    """
+
+    worker = models.ForeignKey(Worker, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    hours = models.BinaryField(max_length=31)
+
+    class Meta:
+        unique_together = ("worker", "year", "month")
+        indexes = [
+            models.Index(fields=["year", "month"], name="archived_month_period_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.worker} - {self.month:02d}.{self.year} (archiwum)"
+
+
+class PayrollPeriod(models.Model):
+    """
+    Rozliczony (zamknięty) miesiąc, w którym nie można już zmieniać godzin.
+    Bez brygady zamyka miesiąc dla wszystkich brygad.
+    """
+
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    brigade = models.ForeignKey(
+        Brigade,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        help_text="Pusta: miesiąc zamknięty dla wszystkich brygad",
+    )
+    locked_at = models.DateTimeField(auto_now_add=True)
+    locked_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    class Meta:
+        ordering = ["-year", "-month"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "month", "brigade"], name="payroll_period_unique"
+            ),
+            # NULLs are distinct in the constraint above.
+            models.UniqueConstraint(
+                fields=["year", "month"],
+                condition=models.Q(brigade__isnull=True),
+                name="payroll_period_unique_all_brigades",
+            ),
+        ]
+
+    def __str__(self):
+        scope = self.brigade or "wszystkie brygady"
+        return f"{self.month:02d}.{self.year} ({scope})"
+
+
+class FrozenTimesheet(models.Model):
+    """Tabela godzin brygady w zamkniętym miesiącu, wyrenderowana przy zamknięciu."""
+
+    period = models.ForeignKey(
+        PayrollPeriod, on_delete=models.CASCADE, related_name="snapshots"
+    )
+    brigade = models.ForeignKey(Brigade, on_delete=models.CASCADE)
+    html = models.TextField()
+
+    class Meta:
+        unique_together = ("period", "brigade")
+
+    def __str__(self):
+        return f"{self.brigade} - {self.period}"
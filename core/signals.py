@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from core.backends import forget_users
+from core.cache import invalidate_brigades, invalidate_months
+from core.instrumentation import record_query
+from core.models import Brigade, TimeSheet, User, Worker
+from core.timesheets import refresh_monthly_hours
+
+# Sent after timesheet rows were written in bulk, bypassing the model signals.
+# Arguments: worker_ids, months (iterable of (year, month) pairs).
+timesheets_changed = Signal()
+
+
+@receiver(post_save, sender=TimeSheet)
+@receiver(post_delete, sender=TimeSheet)
+def timesheet_written(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Worker):
+        # Cascade from a deleted worker, handled by worker_changed.
+        return
+    timesheets_changed.send(
+        sender=TimeSheet,
+        worker_ids=[instance.worker_id],
+        months=[(instance.date.year, instance.date.month)],
+    )
+
+
+@receiver(timesheets_changed)
+def update_monthly_hours(sender, worker_ids, months, **kwargs):
+    refresh_monthly_hours(worker_ids, months)
+
+
+@receiver(timesheets_changed)
+def invalidate_timesheet_tables(sender, worker_ids, months, **kwargs):
+    brigade_ids = set(
+        Worker.brigade.through.objects.filter(worker_id__in=worker_ids).values_list(
+            "brigade_id", flat=True
+        )
+    )
+    months = set(months)
+    transaction.on_commit(lambda: invalidate_months(brigade_ids, months))
+
+
+@receiver(m2m_changed, sender=Worker.brigade.through)
+def brigade_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and not reverse:
+        # The cleared brigades are no longer known once the rows are gone.
+        instance._cleared_brigade_ids = list(
+            instance.brigade.values_list("id", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        brigade_ids = [instance.pk]
+    elif action == "post_clear":
+        brigade_ids = instance.__dict__.pop("_cleared_brigade_ids", [])
+    else:
+        brigade_ids = list(pk_set)
+    transaction.on_commit(lambda: invalidate_brigades(brigade_ids))
+
+
+@receiver(post_save, sender=Worker)
+@receiver(pre_delete, sender=Worker)
+def worker_changed(sender, instance, created=False, **kwargs):
+    # Names are part of the rendered tables, and deleting a worker drops rows.
+    if created:
+        return
+    brigade_ids = list(instance.brigade.values_list("id", flat=True))
+    transaction.on_commit(lambda: invalidate_brigades(brigade_ids))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@receiver(connection_created)
+def instrument_queries(sender, connection, **kwargs):
+    # Sent again on every reconnect of the same connection object.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    forget_users([instance.pk])
+
+
+@receiver(post_save, sender=Brigade)
+def brigade_changed(sender, instance, created, **kwargs):
+    # Cached users carry their brigade.
+    if not created:
+        forget_users(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Brigade)
+def brigade_deleting(sender, instance, **kwargs):
+    # User.brigade is set to NULL without User signals; remember who had it.
+    instance._user_ids = list(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Brigade)
+def brigade_deleted(sender, instance, **kwargs):
+    user_ids = instance.__dict__.pop("_user_ids", [])
+    transaction.on_commit(lambda: forget_users(user_ids))
@@ -0,0 +1,92 @@
+// Client-side behaviour of the timesheet grid (partials/timesheet_wrapper.html).
+(function () {
+  // hx-boost re-runs body scripts on every navigation, register only once.
+  if (window.timesheetGrid) {
+    return;
+  }
+  window.timesheetGrid = true;
+
+  // Fills the worker id or day into a table-level URL template ending in /0/.
+  function gridUrl(template, id) {
+    return template.replace(/\/0\/$/, "/" + id + "/");
+  }
+
+  // Clicking a cell opens its editor locally from the #edit-hours-form template.
+  // Cells carry only their id and value; the save URL comes from the table, so
+  // opening an editor costs no request.
+  document.addEventListener("click", function (event) {
+    var cell = event.target.closest && event.target.closest("#timesheet-body td[id^='cell-']");
+    if (!cell || cell.querySelector("form")) {
+      return;
+    }
+    var table = cell.closest("table");
+    var id = cell.id.split("-");
+    var template = document.getElementById("edit-hours-form");
+    var form = template.content.firstElementChild.cloneNode(true);
+    form.setAttribute("hx-post", gridUrl(table.dataset.saveUrl, id[1]));
+    form.elements.date.value = table.dataset.month + "-" + id[2].padStart(2, "0");
+    form.elements.hours.value = cell.dataset.hours;
+    cell.replaceChildren(form);
+    htmx.process(form);
+    form.elements.hours.focus();
+  });
+
+  // Clicking a "=" cell of the header loads the form filling the whole column.
+  document.addEventListener("click", function (event) {
+    var cell = event.target.closest && event.target.closest("#timesheet-grid td[id^='bulk-cell-']");
+    if (!cell || cell.querySelector("form")) {
+      return;
+    }
+    var table = cell.closest("table");
+    htmx.ajax("GET", gridUrl(table.dataset.bulkFormUrl, cell.id.split("-")[2]), {
+      source: cell,
+      target: cell,
+      swap: "outerHTML",
+    });
+  });
+
+  // Pasting a block copied from a spreadsheet into an open cell saves all the
+  // pasted cells (a row, a column or a whole month) with one batch request.
+  document.addEventListener("paste", function (event) {
+    var input = event.target;
+    var cell = input.closest && input.closest("#timesheet-body td[id^='cell-']");
+    if (!cell) {
+      return;
+    }
+    var text = (event.clipboardData || window.clipboardData).getData("text");
+    var lines = text.replace(/\r/g, "").replace(/\n$/, "").split("\n");
+    if (lines.length === 1 && lines[0].indexOf("\t") === -1) {
+      return; // A single value is an ordinary single-cell edit.
+    }
+    event.preventDefault();
+
+    var rows = Array.from(cell.closest("tbody").querySelectorAll("tr[data-worker-id]"));
+    var firstRow = rows.indexOf(cell.closest("tr"));
+    var firstDay = parseInt(cell.id.split("-")[2], 10);
+    var values = {};
+    lines.forEach(function (line, rowOffset) {
+      var row = rows[firstRow + rowOffset];
+      if (!row) {
+        return;
+      }
+      line.split("\t").forEach(function (value, dayOffset) {
+        var day = firstDay + dayOffset;
+        if (document.getElementById("cell-" + row.dataset.workerId + "-" + day)) {
+          values["h-" + row.dataset.workerId + "-" + day] = value.trim();
+        }
+      });
+    });
+
+    // Drop the single-cell form so that its blur trigger does not save too.
+    var form = input.closest("form");
+    if (form) {
+      form.remove();
+    }
+    var table = cell.closest("table");
+    htmx.ajax("POST", table.dataset.batchUrl, {
+      source: table,
+      values: values,
+      swap: "none",
+    });
+  });
+})();
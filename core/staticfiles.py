@@ -0,0 +1,117 @@
+"""
+Self-hosted static files.
+
+Bootstrap is vendored under ``core/static/vendor`` (``manage.py vendor_assets``
+downloads the pinned releases below again and checks their hashes) and htmx
+comes with django-htmx, so pages need no third-party hosts. ``collectstatic`` writes
+content-hashed names with ``CompressedManifestStaticFilesStorage``, plus gzip
+(and, with the optional ``brotli`` package, brotli) variants of them, which
+``serve_static`` sends with far-future cache headers.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+from functools import cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.templatetags.static import static
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# path under static/: (pinned release URL, subresource integrity hash)
+VENDOR_ASSETS = {
+    "vendor/bootstrap/bootstrap.min.css": (
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.8/dist/css/bootstrap.min.css",
+        "sha384-sRIl4kxILFvY47J16cr9ZwB07vP4J8+LH7qKQnuqkuIAvNWLzeN8tE5YBujZqJLB",
+    ),
+    "vendor/bootstrap/bootstrap.bundle.min.js": (
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.8/dist/js/bootstrap.bundle.min.js",
+        "sha384-FKyoEForCGlyvwx9Hj09JcYn3nv7wiPVlz7YYwJrWVcXK/BmnVDxM+D2scQbITxI",
+    ),
+}
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".json", ".map", ".svg", ".txt", ".html"}
+
+# Names written by ManifestStaticFilesStorage: name.0123456789ab.ext
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@cache
+def is_vendored(path):
+    return finders.find(path) is not None
+
+
+def vendor_asset(path):
+    """
+    ``(url, integrity)`` of a ``VENDOR_ASSETS`` file: the local static file, or
+    in DEBUG, while it is missing, the pinned release with its integrity hash.
+    Outside DEBUG a missing file is an error (see ``core.checks``).
+    """
+    if settings.DEBUG and not is_vendored(path):
+        return VENDOR_ASSETS[path]
+    return static(path), None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage also writing ``.gz``/``.br`` variants of hashed text files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+                self._compress(name)
+
+    def _compress(self, name):
+        with self.open(name) as f:
+            content = f.read()
+        variants = [(".gz", gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli:
+            variants.append((".br", brotli.compress(content)))
+        for suffix, compressed in variants:
+            # Tiny files can grow, those are served as they are.
+            if len(compressed) < len(content):
+                with open(self.path(name + suffix), "wb") as f:
+                    f.write(compressed)
+
+
+def serve_static(request, path):
+    """
+    Send a collected static file, precompressed when the client accepts it.
+    Hashed names never change content and are cached for a year.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    accepted = request.headers.get("Accept-Encoding", "")
+    served, encoding = full_path, None
+    for name, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if name in accepted and os.path.isfile(full_path + suffix):
+            served, encoding = full_path + suffix, name
+            break
+
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    response = FileResponse(open(served, "rb"), content_type=content_type)
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Cache-Control"] = IMMUTABLE if HASHED_NAME_RE.search(path) else "no-cache"
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
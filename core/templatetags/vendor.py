@@ -0,0 +1,26 @@
+from django import template
+from django.utils.html import format_html
+
+from core.staticfiles import vendor_asset
+
+register = template.Library()
+
+
+def _integrity(integrity):
+    if not integrity:
+        return ""
+    return format_html(' integrity="{}" crossorigin="anonymous"', integrity)
+
+
+@register.simple_tag
+def vendor_css(path):
+    url, integrity = vendor_asset(path)
+    return format_html(
+        '<link rel="stylesheet" href="{}"{}>', url, _integrity(integrity)
+    )
+
+
+@register.simple_tag
+def vendor_js(path):
+    url, integrity = vendor_asset(path)
+    return format_html('<script src="{}"{}></script>', url, _integrity(integrity))
@@ -1,3 +1,1615 @@
-from django.test import TestCase
+import csv
+import gzip
+import os
+import re
+import tempfile
+from datetime import date
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Sum
+from django.template.loader import render_to_string
+from django.test import (
+    AsyncClient,
+    Client,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.backends import forget_users
+from core.benchmarks import concurrent_saves, regressions
+from core.cache import brigade_worker_ids
+from core.checks import check_shared_caches, check_vendored_assets
+from core.events import get_broker, timesheet_channel
+from core.imports import import_timesheets
+from core.instrumentation import recent_requests
+from core.exports import timesheet_rows
+from core.models import (
+    ArchivedMonth,
+    Brigade,
+    FrozenTimesheet,
+    MonthlyHours,
+    PayrollPeriod,
+    TimeSheet,
+    User,
+    Worker,
+)
+from core.signals import timesheets_changed
+from core.staticfiles import HASHED_NAME_RE, VENDOR_ASSETS, is_vendored
+from core.timesheets import (
+    build_month_grid,
+    month_entries,
+    month_range,
+    pack_month,
+)
+from core.views import _get_brigade_summaries
+
+
+def normalize_html(html):
+    return re.sub(r">\s+<", "><", html).strip()
+
+
+class TimesheetTestMixin:
+    """Brigade with a foreman and ``worker_count`` workers."""
+
+    worker_count = 40
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.brigade = Brigade.objects.create(name="Brygada Testowa")
+        cls.foreman = User.objects.create_user(
+            username="brygadzista",
+            password="haslo",
+            role=User.Role.BRYGADZISTA,
+            brigade=cls.brigade,
+        )
+        cls.workers = Worker.objects.bulk_create(
+            Worker(first_name=f"Jan{i:02d}", last_name=f"Kowalski{i:02d}")
+            for i in range(cls.worker_count)
+        )
+        cls.brigade.workers.add(*cls.workers)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.foreman)
+
+    def fill_month(self, year, month, days, hours=8):
+        TimeSheet.objects.bulk_create(
+            TimeSheet(worker=worker, date=date(year, month, day), hours_worked=hours)
+            for worker in self.workers
+            for day in days
+        )
+
+
+class DashboardQueryCountTests(TimesheetTestMixin, TestCase):
+    def test_dashboard_query_count_does_not_grow_with_entries(self):
+        self.fill_month(2025, 6, range(1, 31))
+        url = reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6})
+
+        # user, frozen table, workers, archived months, timesheet grid
+        with self.assertNumQueries(5):
+            response = self.client.get(url, HTTP_HX_REQUEST="true")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "data-worker-id=", count=self.worker_count)
+
+    def test_dashboard_grid_values(self):
+        worker = self.workers[0]
+        TimeSheet.objects.create(worker=worker, date=date(2025, 6, 3), hours_worked=7)
+        TimeSheet.objects.create(worker=worker, date=date(2025, 6, 4), hours_worked=0)
+        url = reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6})
+
+        response = self.client.get(url, HTTP_HX_REQUEST="true")
+
+        self.assertEqual(response.context["hours_map"], {worker.id: {3: 7, 4: 0}})
+        rows, _ = build_month_grid([worker], 2025, 6, 30)
+        self.assertEqual(rows[0]["worker"], worker)
+        self.assertEqual(len(rows[0]["cells"]), 30)
+        self.assertEqual(rows[0]["cells"][2], (3, 7))
+        self.assertEqual(rows[0]["cells"][3], (4, 0))
+        self.assertEqual(rows[0]["cells"][4], (5, None))
+
+    def test_bulk_save_hours_query_count(self):
+        self.fill_month(2025, 6, range(1, 15))
+        url = reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6})
+
+        # user, payroll lock, worker ids, archived days, savepoint, insert,
+        # affected cells, rollup sums, archived months, rollup upsert,
+        # memberships, release, live update memberships
+        with self.assertNumQueries(13), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                url, {"day": 15, "hours_15": "8"}, HTTP_HX_REQUEST="true"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            TimeSheet.objects.filter(date=date(2025, 6, 15)).count(),
+            self.worker_count,
+        )
+
+
+class BrigadeLookupTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    def test_full_page_loads_brigade_with_user(self):
+        url = reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6})
+
+        # user with brigade, frozen table, workers, archived months, timesheet grid
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+
+        self.assertContains(response, "Zarządzasz brygadą: <strong>Brygada Testowa")
+
+    def test_bulk_save_reuses_cached_worker_ids(self):
+        url = reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6})
+        self.client.post(url, {"day": 2, "hours_2": "8"}, HTTP_HX_REQUEST="true")
+
+        # payroll lock, archived days, savepoint, insert, affected cells, rollup
+        # sums, archived months, rollup upsert, memberships, release (the live
+        # update waits for the commit)
+        with self.assertNumQueries(10):
+            self.client.post(url, {"day": 3, "hours_3": "8"}, HTTP_HX_REQUEST="true")
+
+    def test_worker_ids_follow_membership_and_names(self):
+        first, second, third = self.workers
+        self.assertEqual(
+            brigade_worker_ids(self.brigade.id), [first.id, second.id, third.id]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.brigade.workers.remove(second)
+            first.last_name = "Zieliński"
+            first.save()
+
+        self.assertEqual(brigade_worker_ids(self.brigade.id), [third.id, first.id])
+        with self.assertNumQueries(0):
+            brigade_worker_ids(self.brigade.id)
+
+
+class MonthRangeTests(TestCase):
+    def test_month_range_is_half_open(self):
+        self.assertEqual(month_range(2025, 6), (date(2025, 6, 1), date(2025, 7, 1)))
+        self.assertEqual(month_range(2025, 12), (date(2025, 12, 1), date(2026, 1, 1)))
+
+    def test_month_entries_is_index_only(self):
+        plan = month_entries([1, 2, 3], 2025, 6).explain()
+
+        self.assertIn("USING COVERING INDEX ts_worker_date_hours_idx", plan)
+
+
+class TableBodyRenderTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    def table_context(self, year, month, num_days):
+        rows, hours_map = build_month_grid(self.workers, year, month, num_days)
+        return {
+            "workers": self.workers,
+            "rows": rows,
+            "hours_map": hours_map,
+            "days": list(range(1, num_days + 1)),
+            "current_year": year,
+            "current_month": month,
+        }
+
+    def test_cells_match_timesheet_cell_partial(self):
+        self.fill_month(2025, 6, range(1, 20), hours=6)
+        TimeSheet.objects.filter(worker=self.workers[2]).delete()
+        context = self.table_context(2025, 6, 30)
+
+        table = normalize_html(render_to_string("partials/table_body.html", context))
+
+        for worker in self.workers:
+            for day in (1, 19, 20):
+                cell = render_to_string(
+                    "partials/timesheet_cell.html",
+                    {
+                        "worker_id": worker.id,
+                        "day": day,
+                        "hours": context["hours_map"].get(worker.id, {}).get(day),
+                        "current_year": 2025,
+                        "current_month": 6,
+                    },
+                )
+                self.assertIn(normalize_html(cell), table)
+
+    def test_empty_brigade(self):
+        self.workers = []
+        context = self.table_context(2025, 6, 30)
+
+        html = render_to_string("partials/table_body.html", context)
+
+        self.assertIn('colspan="31"', html)
+
+
+class TimesheetTableCacheTests(TimesheetTestMixin, TestCase):
+    worker_count = 5
+
+    def get_month(self, year=2025, month=6):
+        url = reverse("dashboard_by_date", kwargs={"year": year, "month": month})
+        return self.client.get(url, HTTP_HX_REQUEST="true")
+
+    def test_cached_month_skips_grid_queries(self):
+        self.get_month()
+
+        # frozen table; session and user come from the cache
+        with self.assertNumQueries(1):
+            response = self.get_month()
+
+        self.assertContains(response, "data-worker-id=", count=self.worker_count)
+
+    def test_save_hours_invalidates_only_its_month(self):
+        self.get_month(2025, 5)
+        self.get_month(2025, 6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("save_hours", kwargs={"worker_id": self.workers[0].id}),
+                {"date": "2025-06-03", "hours": "7"},
+            )
+
+        with self.assertNumQueries(1):
+            self.get_month(2025, 5)
+        response = self.get_month(2025, 6)
+        self.assertEqual(response.context["hours_map"], {self.workers[0].id: {3: 7}})
+
+    def test_bulk_save_hours_invalidates_month(self):
+        self.get_month()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6}),
+                {"day": 2, "hours_2": "8"},
+                HTTP_HX_REQUEST="true",
+            )
+
+        response = self.get_month()
+        self.assertEqual(
+            response.context["hours_map"],
+            {worker.id: {2: 8} for worker in self.workers},
+        )
+
+    def test_membership_change_invalidates_brigade(self):
+        self.get_month()
+        newcomer = Worker.objects.create(first_name="Nowy", last_name="Pracownik")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer.brigade.add(self.brigade)
+
+        self.assertContains(self.get_month(), "Nowy Pracownik")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer.brigade.clear()
+
+        self.assertNotContains(self.get_month(), "Nowy Pracownik")
+
+    def test_worker_rename_invalidates_brigade(self):
+        self.get_month()
+        worker = self.workers[0]
+        worker.last_name = "Zmieniony"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            worker.save()
+
+        self.assertContains(self.get_month(), "Zmieniony")
+
+
+class InlineEditingTests(TimesheetTestMixin, TestCase):
+    worker_count = 2
+
+    def test_cells_carry_value_and_save_url(self):
+        worker = self.workers[0]
+        TimeSheet.objects.create(worker=worker, date=date(2025, 6, 3), hours_worked=7)
+        TimeSheet.objects.create(worker=worker, date=date(2025, 6, 4), hours_worked=0)
+
+        response = self.client.get(
+            reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6}),
+            HTTP_HX_REQUEST="true",
+        )
+
+        html = " ".join(response.content.decode().split())
+        self.assertIn(f'<td id="cell-{worker.id}-3" data-hours="7">7</td>', html)
+        self.assertIn(f'<td id="cell-{worker.id}-4" data-hours="0">-</td>', html)
+        self.assertIn(f'<td id="cell-{worker.id}-5" data-hours="">-</td>', html)
+        self.assertIn('<template id="edit-hours-form">', html)
+        self.assertIn('data-month="2025-06"', html)
+        # One URL template per table instead of a reversed URL per cell.
+        self.assertIn(f'data-save-url="{reverse("save_hours", args=[0])}"', html)
+        self.assertEqual(html.count("/save-hours/"), 1)
+
+    def test_save_hours_renders_cell(self):
+        worker = self.workers[0]
+
+        response = self.client.post(
+            reverse("save_hours", kwargs={"worker_id": worker.id}),
+            {"date": "2025-06-03", "hours": "6"},
+        )
+
+        self.assertContains(response, 'data-hours="6"')
+        self.assertEqual(TimeSheet.objects.get(worker=worker).hours_worked, 6)
+
+
+class AsyncViewTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    async def test_save_and_dashboard_over_asgi(self):
+        worker = self.workers[0]
+        await self.async_client.aforce_login(self.foreman)
+
+        response = await self.async_client.post(
+            reverse("save_hours", kwargs={"worker_id": worker.id}),
+            {"date": "2025-06-03", "hours": "6"},
+        )
+        self.assertContains(response, 'data-hours="6"')
+
+        response = await self.async_client.get(
+            reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6}),
+            headers={"HX-Request": "true"},
+        )
+        self.assertContains(response, f'id="cell-{worker.id}-3"')
+        self.assertEqual(response.context["hours_map"], {worker.id: {3: 6}})
+
+    async def test_bulk_save_over_asgi(self):
+        await self.async_client.aforce_login(self.foreman)
+
+        response = await self.async_client.post(
+            reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6}),
+            {"day": "2", "day_to": "3", "hours_2": "8"},
+            headers={"HX-Request": "true"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await TimeSheet.objects.acount(), 6)
+        monthly = await MonthlyHours.objects.aget(worker=self.workers[0])
+        self.assertEqual(monthly.total_hours, 16)
+
+
+class RecordingBroker:
+    """Stand-in broker keeping what is published."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class LiveUpdateTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    async def open_stream(self, year=2025, month=6):
+        await self.async_client.aforce_login(self.foreman)
+        response = await self.async_client.get(
+            reverse("timesheet_events", kwargs={"year": year, "month": month})
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        # The subscription is open once the first chunk is out.
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+        return stream
+
+    async def test_saved_cell_reaches_open_grid(self):
+        stream = await self.open_stream()
+        boss = await User.objects.acreate(username="szef", role=User.Role.SZEF)
+        other = AsyncClient()
+        await other.aforce_login(boss)
+
+        await other.post(
+            reverse("save_hours", kwargs={"worker_id": self.workers[1].id}),
+            {"date": "2025-06-03", "hours": "6"},
+        )
+
+        event = (await anext(stream)).decode()
+        await stream.aclose()
+        self.assertTrue(event.startswith("event: cells\ndata: "))
+        cell = f'<td id="cell-{self.workers[1].id}-3" data-hours="6" hx-swap-oob'
+        self.assertIn(cell, event)
+
+    async def test_other_months_are_not_sent(self):
+        stream = await self.open_stream(month=7)
+        get_broker().publish(timesheet_channel(self.brigade.id, 2025, 6), "czerwiec")
+        get_broker().publish(timesheet_channel(self.brigade.id, 2025, 7), "lipiec")
+
+        self.assertEqual(await anext(stream), b"event: cells\ndata: lipiec\n\n")
+        await stream.aclose()
+
+    @override_settings(TIMESHEET_EVENTS_BROKER="core.tests.RecordingBroker")
+    def test_batch_save_published_after_commit(self):
+        get_broker.cache_clear()
+        self.addCleanup(get_broker.cache_clear)
+        published = get_broker().published
+        url = reverse("save_hours_batch", kwargs={"year": 2025, "month": 6})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {f"h-{self.workers[0].id}-2": "8"})
+            self.assertEqual(published, [])
+
+        [(channel, message)] = published
+        self.assertEqual(channel, timesheet_channel(self.brigade.id, 2025, 6))
+        self.assertIn(f'id="cell-{self.workers[0].id}-2"', message)
+
+    def test_not_streamed_over_wsgi(self):
+        url = reverse("timesheet_events", kwargs={"year": 2025, "month": 6})
+        self.assertEqual(self.client.get(url).status_code, 204)
+
+
+class ConditionalGetTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6})
+        # The first page sets the CSRF cookie, which is part of the ETag.
+        self.client.get(self.url)
+
+    def test_unchanged_month_answered_before_grid_work(self):
+        etag = self.client.get(self.url, HTTP_HX_REQUEST="true")["ETag"]
+
+        # Session and user come from the cache.
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, HTTP_HX_REQUEST="true", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_etag_changes_with_the_month(self):
+        etag = self.client.get(self.url, HTTP_HX_REQUEST="true")["ETag"]
+        page_etag = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(etag, page_etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("save_hours", kwargs={"worker_id": self.workers[0].id}),
+                {"date": "2025-06-03", "hours": "6"},
+            )
+        response = self.client.get(
+            self.url, HTTP_HX_REQUEST="true", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'data-hours="6"')
+
+    def test_page_etag_follows_brigade_name(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+            )
+
+        self.brigade.name = "Nowa nazwa"
+        self.brigade.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Nowa nazwa")
+
+    def test_locking_changes_etag(self):
+        etag = self.client.get(self.url, HTTP_HX_REQUEST="true")["ETag"]
+        boss = User.objects.create_user(username="szef", role=User.Role.SZEF)
+        self.client.force_login(boss)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("payroll_periods"), {"year": 2025, "month": 6})
+
+        self.client.force_login(self.foreman)
+        response = self.client.get(
+            self.url, HTTP_HX_REQUEST="true", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_warns_about_process_local_caches(self):
+        self.assertEqual(
+            [warning.obj for warning in check_shared_caches(None)],
+            ["default", "sessions"],
+        )
+
+        shared = {
+            alias: {"BACKEND": "django.core.cache.backends.redis.RedisCache"}
+            for alias in ("default", "sessions")
+        }
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_shared_caches(None), [])
+
+
+class SaveHoursScopeTests(TimesheetTestMixin, TestCase):
+    worker_count = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_brigade = Brigade.objects.create(name="Brygada Druga")
+        cls.other_worker = Worker.objects.create(first_name="Adam", last_name="Nowak")
+        cls.other_brigade.workers.add(cls.other_worker)
+
+    def save(self, worker_id, hours="6"):
+        return self.client.post(
+            reverse("save_hours", kwargs={"worker_id": worker_id}),
+            {"date": "2025-06-03", "hours": hours},
+        )
+
+    def test_cross_brigade_writes_rejected(self):
+        TimeSheet.objects.create(
+            worker=self.other_worker, date=date(2025, 6, 3), hours_worked=8
+        )
+
+        self.assertEqual(self.save(self.other_worker.id).status_code, 404)
+        self.assertEqual(self.save(self.other_worker.id, hours="").status_code, 404)
+        self.assertEqual(self.save(10**6).status_code, 404)
+        self.assertEqual(TimeSheet.objects.get().hours_worked, 8)
+
+    def test_scope_check_costs_no_query(self):
+        self.save(self.workers[0].id)
+
+        # payroll lock, savepoint, select, update, rollup sums, archived months,
+        # rollup upsert, memberships, release, live update memberships
+        with self.assertNumQueries(10), self.captureOnCommitCallbacks(execute=True):
+            response = self.save(self.workers[0].id, hours="7")
+
+        self.assertContains(response, 'data-hours="7"')
+
+
+class SessionCacheTests(TimesheetTestMixin, TestCase):
+    worker_count = 2
+
+    def save_queries(self, uncached_user=False):
+        """SQL of a ``save_hours`` after a first one, by a new client."""
+        self.client = Client()
+        self.client.force_login(self.foreman)
+        url = reverse("save_hours", kwargs={"worker_id": self.workers[0].id})
+        self.client.post(url, {"date": "2025-06-03", "hours": "5"})
+        if uncached_user:
+            forget_users([self.foreman.pk])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, {"date": "2025-06-03", "hours": "6"})
+        return [query["sql"] for query in queries]
+
+    def test_save_hours_reads_session_and_user_from_cache(self):
+        # The former setup: database sessions and the user read on every request.
+        with override_settings(SESSION_ENGINE="django.contrib.sessions.backends.db"):
+            before = self.save_queries(uncached_user=True)
+        after = self.save_queries()
+
+        self.assertEqual(len(before) - len(after), 2)
+        self.assertTrue(any("django_session" in sql for sql in before))
+        self.assertTrue(any('FROM "core_user"' in sql for sql in before))
+        for sql in after:
+            self.assertNotIn("django_session", sql)
+            self.assertNotIn('FROM "core_user"', sql)
+
+    def test_cached_user_follows_changes(self):
+        self.save_queries()
+        self.brigade.name = "Nowa nazwa"
+        self.brigade.save()
+
+        response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "Nowa nazwa")
+
+        self.foreman.is_active = False
+        self.foreman.save()
+        self.assertEqual(self.client.get(reverse("dashboard")).status_code, 302)
+
+    def test_cached_user_forgets_deleted_brigade(self):
+        self.save_queries()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.brigade.delete()
+
+        response = self.client.get(reverse("dashboard"))
+        self.assertIsNone(response.wsgi_request.user.brigade_id)
+        self.assertNotContains(response, "Brygada Testowa")
+
+
+class SaveHoursBatchTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    def post_batch(self, data, year=2025, month=6):
+        url = reverse("save_hours_batch", kwargs={"year": year, "month": month})
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data, HTTP_HX_REQUEST="true")
+
+    def test_saves_updates_and_clears_cells(self):
+        first, second, _ = self.workers
+        TimeSheet.objects.create(worker=first, date=date(2025, 6, 2), hours_worked=4)
+        TimeSheet.objects.create(worker=second, date=date(2025, 6, 3), hours_worked=4)
+
+        response = self.post_batch(
+            {
+                f"h-{first.id}-1": "8",
+                f"h-{first.id}-2": "10",
+                f"h-{second.id}-3": "",
+                f"h-{second.id}-4": "abc",
+                f"h-{second.id}-31": "8",
+            }
+        )
+
+        self.assertEqual(
+            set(
+                TimeSheet.objects.values_list("worker_id", "date__day", "hours_worked")
+            ),
+            {(first.id, 1, 8), (first.id, 2, 10)},
+        )
+        self.assertContains(response, 'hx-swap-oob="outerHTML"', count=3)
+        self.assertContains(response, f'id="cell-{second.id}-3"')
+        self.assertNotContains(response, f'id="cell-{second.id}-4"')
+
+    def test_month_of_cells_in_constant_queries(self):
+        data = {
+            f"h-{worker.id}-{day}": "8"
+            for worker in self.workers
+            for day in range(1, 31)
+        }
+
+        # user, allowed workers, payroll lock, savepoint, upsert, rollup sums,
+        # archived months, rollup upsert, memberships, release,
+        # memberships for the live update
+        with self.assertNumQueries(11):
+            self.post_batch(data)
+
+        self.assertEqual(TimeSheet.objects.count(), self.worker_count * 30)
+
+        # Clearing them is one delete instead of a query per row, plus the
+        # archived months to blank; user and brigade workers are cached by now,
+        # and the rollup is deleted.
+        with self.assertNumQueries(10):
+            self.post_batch(dict.fromkeys(data, ""))
+
+        self.assertFalse(TimeSheet.objects.exists())
+        self.assertFalse(MonthlyHours.objects.exists())
+
+    def test_ignores_workers_outside_brigade(self):
+        outsider = Worker.objects.create(first_name="Obcy", last_name="Pracownik")
+
+        response = self.post_batch({f"h-{outsider.id}-1": "8"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TimeSheet.objects.exists())
+
+    def test_foreman_without_brigade_rejected(self):
+        outsider = Worker.objects.create(first_name="Obcy", last_name="Pracownik")
+        self.foreman.brigade = None
+        self.foreman.save()
+
+        response = self.post_batch({f"h-{outsider.id}-3": "9"})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(TimeSheet.objects.exists())
+
+
+class BulkSaveHoursTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    def post_bulk(self, data):
+        url = reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6})
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data, HTTP_HX_REQUEST="true")
+
+    def hours(self):
+        return dict(
+            ((worker_id, day), hours)
+            for worker_id, day, hours in TimeSheet.objects.values_list(
+                "worker_id", "date__day", "hours_worked"
+            )
+        )
+
+    def test_fill_keeps_existing_entries(self):
+        first = self.workers[0]
+        TimeSheet.objects.create(worker=first, date=date(2025, 6, 2), hours_worked=4)
+
+        response = self.post_bulk({"day": 2, "hours_2": "8"})
+
+        self.assertEqual(self.hours()[first.id, 2], 4)
+        self.assertEqual(len(self.hours()), self.worker_count)
+        self.assertContains(response, 'hx-swap-oob="outerHTML"', count=3)
+        self.assertContains(response, 'data-hours="4"')
+        self.assertContains(response, '<td id="bulk-cell-2">=</td>')
+
+    def test_overwrite_replaces_existing_entries(self):
+        first = self.workers[0]
+        TimeSheet.objects.create(worker=first, date=date(2025, 6, 2), hours_worked=4)
+
+        self.post_bulk({"day": 2, "hours_2": "8", "mode": "overwrite"})
+
+        self.assertEqual(set(self.hours().values()), {8})
+
+    def test_failed_rollup_rolls_back_entries(self):
+        def fail(**kwargs):
+            raise RuntimeError
+
+        timesheets_changed.connect(fail)
+        self.addCleanup(timesheets_changed.disconnect, fail)
+
+        with self.assertRaises(RuntimeError):
+            self.post_bulk({"day": 2, "hours_2": "8"})
+
+        self.assertFalse(TimeSheet.objects.exists())
+
+    def test_weekday_range(self):
+        # June 2025: the 1st is a Sunday, the 30th a Monday.
+        response = self.post_bulk(
+            {"day": 1, "hours_1": "8", "day_to": "31", "weekdays": "on"}
+        )
+
+        days = {day for _, day in self.hours()}
+        self.assertEqual(len(days), 21)
+        self.assertNotIn(1, days)
+        self.assertIn(30, days)
+        self.assertContains(
+            response, 'hx-swap-oob="outerHTML"', count=21 * self.worker_count
+        )
+
+
+class MonthlyHoursTests(TimesheetTestMixin, TestCase):
+    worker_count = 2
+
+    def rollup(self):
+        return set(
+            MonthlyHours.objects.values_list(
+                "worker_id", "year", "month", "total_hours", "days_worked"
+            )
+        )
+
+    def save_hours(self, worker, day, hours):
+        self.client.post(
+            reverse("save_hours", kwargs={"worker_id": worker.id}),
+            {"date": f"2025-06-{day:02d}", "hours": hours},
+        )
+
+    def test_maintained_by_single_and_bulk_saves(self):
+        first, second = self.workers
+
+        self.save_hours(first, 2, "8")
+        self.save_hours(first, 3, "0")
+        self.client.post(
+            reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6}),
+            {"day": 4, "hours_4": "6"},
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertEqual(
+            self.rollup(),
+            {(first.id, 2025, 6, 14, 2), (second.id, 2025, 6, 6, 1)},
+        )
+
+    def test_clearing_last_entry_removes_row(self):
+        first = self.workers[0]
+        self.save_hours(first, 2, "8")
+
+        self.save_hours(first, 2, "")
+
+        self.assertEqual(self.rollup(), set())
+
+    def test_rebuild_command(self):
+        self.fill_month(2025, 5, range(1, 11), hours=8)
+        self.fill_month(2025, 6, range(1, 3), hours=4)
+        MonthlyHours.objects.all().delete()
+
+        call_command("rebuild_monthly_hours", stdout=StringIO())
+
+        self.assertEqual(
+            self.rollup(),
+            {(worker.id, 2025, 5, 80, 10) for worker in self.workers}
+            | {(worker.id, 2025, 6, 8, 2) for worker in self.workers},
+        )
+
+
+class ArchiveMonthsTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    def setUp(self):
+        super().setUp()
+        self.fill_month(2025, 6, range(2, 7))
+        self.fill_month(2025, 7, [1])
+        TimeSheet.objects.create(
+            worker=self.workers[0], date=date(2025, 6, 9), hours_worked=0
+        )
+        call_command("rebuild_monthly_hours", stdout=StringIO())
+
+    def snapshot(self):
+        cache.clear()
+        response = self.client.get(
+            reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6}),
+            HTTP_HX_REQUEST="true",
+        )
+        return (
+            response.context["hours_map"],
+            list(timesheet_rows()),
+            list(
+                MonthlyHours.objects.order_by("worker", "year", "month").values_list(
+                    "worker", "year", "month", "total_hours", "days_worked"
+                )
+            ),
+        )
+
+    def test_archived_months_read_like_live_ones(self):
+        before = self.snapshot()
+
+        call_command("archive_months", "--before", "2025-07", stdout=StringIO())
+
+        self.assertEqual(ArchivedMonth.objects.count(), 3)
+        self.assertFalse(TimeSheet.objects.filter(date__lt=date(2025, 7, 1)).exists())
+        self.assertEqual(TimeSheet.objects.count(), 3)
+        self.assertEqual(self.snapshot(), before)
+        call_command("rebuild_monthly_hours", stdout=StringIO())
+        self.assertEqual(self.snapshot(), before)
+
+        call_command(
+            "archive_months", "--before", "2025-07", "--restore", stdout=StringIO()
+        )
+
+        self.assertFalse(ArchivedMonth.objects.exists())
+        self.assertEqual(TimeSheet.objects.count(), 3 * 5 + 1 + 3)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_live_entries_win_over_archived_days(self):
+        worker = self.workers[0]
+        call_command("archive_months", "--before", "2025-07", stdout=StringIO())
+
+        self.client.post(
+            reverse("save_hours", kwargs={"worker_id": worker.id}),
+            {"date": "2025-06-03", "hours": "5"},
+        )
+
+        hours_map, rows, _ = self.snapshot()
+        self.assertEqual(hours_map[worker.id], {2: 8, 3: 5, 4: 8, 5: 8, 6: 8, 9: 0})
+        self.assertEqual(rows[1][4:7], ["", 8, 5])
+        monthly = MonthlyHours.objects.get(worker=worker, year=2025, month=6)
+        self.assertEqual((monthly.total_hours, monthly.days_worked), (37, 5))
+
+    def test_bulk_fill_keeps_archived_days(self):
+        TimeSheet.objects.filter(worker=self.workers[0], date__day=3).update(
+            hours_worked=5
+        )
+        call_command("rebuild_monthly_hours", stdout=StringIO())
+        call_command("archive_months", "--before", "2025-07", stdout=StringIO())
+        before = self.snapshot()
+
+        response = self.client.post(
+            reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6}),
+            {"day": 2, "day_to": 9, "hours_2": "8"},
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertContains(
+            response, f'id="cell-{self.workers[0].id}-3" data-hours="5"'
+        )
+        hours_map, _, rollup = self.snapshot()
+        for worker in self.workers:
+            self.assertEqual(
+                {day: hours for day, hours in hours_map[worker.id].items() if day < 7},
+                {day: hours for day, hours in before[0][worker.id].items() if day < 7},
+            )
+        self.assertEqual(hours_map[self.workers[0].id][3], 5)
+        self.assertEqual(hours_map[self.workers[1].id][7], 8)
+        self.assertEqual(hours_map[self.workers[0].id][9], 0)
+        self.assertEqual(
+            MonthlyHours.objects.get(worker=self.workers[0], month=6).total_hours,
+            37 + 8 + 8,
+        )
+
+    def test_cleared_days_do_not_fall_back_to_archive(self):
+        first, second, third = self.workers
+        call_command("archive_months", "--before", "2025-07", stdout=StringIO())
+
+        response = self.client.post(
+            reverse("save_hours", kwargs={"worker_id": first.id}),
+            {"date": "2025-06-03", "hours": ""},
+        )
+        self.assertContains(response, 'data-hours=""')
+        url = reverse("save_hours_batch", kwargs={"year": 2025, "month": 6})
+        self.client.post(url, {f"h-{second.id}-{day}": "" for day in range(2, 7)})
+
+        hours_map, _, _ = self.snapshot()
+        self.assertEqual(hours_map[first.id], {2: 8, 4: 8, 5: 8, 6: 8, 9: 0})
+        self.assertNotIn(second.id, hours_map)
+        self.assertEqual(hours_map[third.id], {2: 8, 3: 8, 4: 8, 5: 8, 6: 8})
+        self.assertFalse(ArchivedMonth.objects.filter(worker=second).exists())
+        self.assertEqual(
+            set(
+                MonthlyHours.objects.filter(year=2025, month=6).values_list(
+                    "worker", "total_hours", "days_worked"
+                )
+            ),
+            {(first.id, 32, 4), (third.id, 40, 5)},
+        )
+
+    def test_current_month_is_not_archived(self):
+        with self.assertRaises(CommandError):
+            call_command("archive_months", "--before", "2999-01", stdout=StringIO())
+
+
+class PayrollPeriodTests(TimesheetTestMixin, TestCase):
+    worker_count = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.boss = User.objects.create_user(username="szef", role=User.Role.SZEF)
+        cls.other_brigade = Brigade.objects.create(name="Brygada Druga")
+        cls.other_worker = Worker.objects.create(first_name="Adam", last_name="Nowak")
+        cls.other_brigade.workers.add(cls.other_worker)
+
+    def setUp(self):
+        super().setUp()
+        self.fill_month(2025, 6, range(2, 7))
+
+    def lock(self, brigade=None):
+        self.client.force_login(self.boss)
+        self.client.post(
+            reverse("payroll_periods"),
+            {"year": 2025, "month": 6, "brigade": brigade.id if brigade else ""},
+        )
+        self.client.force_login(self.foreman)
+
+    def get_june(self, **headers):
+        url = reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6})
+        return self.client.get(url, **headers)
+
+    def save(self, worker, day="2025-06-03", hours="5"):
+        return self.client.post(
+            reverse("save_hours", kwargs={"worker_id": worker.id}),
+            {"date": day, "hours": hours},
+        )
+
+    def test_locked_month_served_from_frozen_table(self):
+        self.lock(self.brigade)
+        self.assertEqual(FrozenTimesheet.objects.count(), 1)
+        # Not a live aggregation: later changes do not show up.
+        TimeSheet.objects.update(hours_worked=1)
+
+        # user, frozen table
+        with self.assertNumQueries(2):
+            response = self.get_june(HTTP_HX_REQUEST="true")
+
+        html = response.content.decode()
+        self.assertIn("Miesiąc zamknięty", html)
+        self.assertNotIn("data-save-url", html)
+        self.assertNotIn("bulk-cell", html)
+        self.assertIn("<strong>40</strong>", html)
+        self.assertContains(self.get_june(), "Miesiąc zamknięty")
+        self.assertNotContains(
+            self.client.get(
+                reverse("dashboard_by_date", kwargs={"year": 2025, "month": 7})
+            ),
+            "Miesiąc zamknięty",
+        )
+
+    def test_locked_month_rejects_edits(self):
+        self.lock(self.brigade)
+        worker = self.workers[0]
+
+        self.assertEqual(self.save(worker).status_code, 403)
+        self.assertEqual(self.save(worker, hours="").status_code, 403)
+        response = self.client.post(
+            reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6}),
+            {"day": 9, "hours_9": "8"},
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            reverse("save_hours_batch", kwargs={"year": 2025, "month": 6}),
+            {f"h-{worker.id}-9": "8"},
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(TimeSheet.objects.count(), 2 * 5)
+
+        # Other months and other brigades stay open.
+        self.assertEqual(self.save(worker, day="2025-07-01").status_code, 200)
+        self.client.force_login(self.boss)
+        self.assertEqual(self.save(self.other_worker).status_code, 200)
+
+    def test_lock_of_other_brigade_covers_shared_workers(self):
+        shared = self.workers[0]
+        self.other_brigade.workers.add(shared)
+        self.lock(self.other_brigade)
+
+        response = self.client.post(
+            reverse("bulk_save_hours", kwargs={"year": 2025, "month": 6}),
+            {"day": 2, "hours_2": "1", "mode": "overwrite"},
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(
+            TimeSheet.objects.get(worker=shared, date__day=2).hours_worked, 8
+        )
+
+    def test_lock_for_all_brigades(self):
+        self.lock()
+
+        self.assertEqual(FrozenTimesheet.objects.count(), 2)
+        self.client.force_login(self.boss)
+        self.assertEqual(self.save(self.other_worker).status_code, 403)
+        content = StringIO("Pracownik,Rok,Miesiąc,1\nAdam Nowak,2025,6,8\n")
+        self.assertEqual(import_timesheets(content), (0, [(2, "Miesiąc zamknięty")]))
+
+    def test_unlock_brings_back_live_table(self):
+        self.lock(self.brigade)
+        self.client.force_login(self.boss)
+        self.client.post(
+            reverse("payroll_periods"), {"unlock": PayrollPeriod.objects.get().id}
+        )
+        self.client.force_login(self.foreman)
+
+        self.assertFalse(FrozenTimesheet.objects.exists())
+        self.assertContains(self.get_june(HTTP_HX_REQUEST="true"), "data-save-url")
+        self.assertEqual(self.save(self.workers[0]).status_code, 200)
+
+
+class AssignWorkersTests(TimesheetTestMixin, TestCase):
+    worker_count = 60
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.boss = User.objects.create_user(username="szef", role=User.Role.SZEF)
+        cls.newcomers = Worker.objects.bulk_create(
+            Worker(first_name=f"Adam{i:02d}", last_name=f"Nowak{i:02d}")
+            for i in range(5)
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.boss)
+        self.url = reverse("assign_workers", kwargs={"brigade_id": self.brigade.id})
+
+    def test_membership_applied_as_one_diff(self):
+        brigade_worker_ids(self.brigade.id)
+        add = [worker.id for worker in self.newcomers] + [self.workers[0].id]
+        remove = [worker.id for worker in self.workers[:3]]
+
+        # user, brigade, new workers, insert, delete (+ savepoint pair)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(7):
+                response = self.client.post(self.url, {"add": add, "remove": remove})
+
+        self.assertEqual(response.status_code, 302)
+        members = set(self.brigade.workers.values_list("id", flat=True))
+        self.assertTrue(members.issuperset(worker.id for worker in self.newcomers))
+        self.assertTrue(members.isdisjoint(remove))
+        self.assertEqual(len(members), 62)
+        # Bulk writes skip m2m_changed, the cached worker ids are dropped anyway.
+        self.assertEqual(len(brigade_worker_ids(self.brigade.id)), 62)
+
+    def test_lists_are_paginated_and_searched(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["assigned"].paginator.count, 60)
+        self.assertEqual(len(response.context["assigned"]), 50)
+        self.assertEqual(response.context["available"].paginator.count, 5)
+
+        response = self.client.get(
+            self.url, {"assigned_q": "kowalski1 jan1", "assigned_page": "2"}
+        )
+        assigned = response.context["assigned"]
+        self.assertEqual(assigned.number, 1)
+        self.assertEqual(
+            [worker.last_name for worker in assigned],
+            [f"Kowalski{i}" for i in range(10, 20)],
+        )
+        self.assertContains(response, "Nowak04")
+
+        response = self.client.get(self.url, {"available_page": "2"})
+        self.assertEqual(response.context["available"].number, 1)
+
+    def test_search_uses_name_index(self):
+        plan = Worker.objects.filter(last_name__istartswith="kow").explain()
+        self.assertIn("worker_name_search_idx", plan)
+
+    def test_foreman_forbidden(self):
+        self.client.force_login(self.foreman)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_manage_workers_lists_and_adds_workers(self):
+        url = reverse("manage_workers")
+        response = self.client.get(url, {"q": "nowak"})
+        self.assertEqual(response.context["workers"].paginator.count, 5)
+        self.assertContains(response, "Adam00 Nowak00")
+
+        response = self.client.post(url, {"first_name": "Ewa", "last_name": "Zięba"})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Worker.objects.filter(last_name="Zięba").exists())
+        response = self.client.post(url, {"first_name": "Ewa"})
+        self.assertContains(response, "Podaj imię i nazwisko.")
+
+
+class ReportViewTests(TimesheetTestMixin, TestCase):
+    worker_count = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.boss = User.objects.create_user(username="szef", role=User.Role.SZEF)
+        other = Brigade.objects.create(name="Brygada Druga")
+        other.workers.add(cls.workers[0])
+        MonthlyHours.objects.bulk_create(
+            [
+                MonthlyHours(
+                    worker=cls.workers[0],
+                    year=2025,
+                    month=5,
+                    total_hours=80,
+                    days_worked=10,
+                ),
+                MonthlyHours(
+                    worker=cls.workers[0],
+                    year=2025,
+                    month=6,
+                    total_hours=40,
+                    days_worked=5,
+                ),
+                MonthlyHours(
+                    worker=cls.workers[1],
+                    year=2025,
+                    month=6,
+                    total_hours=16,
+                    days_worked=2,
+                ),
+            ]
+        )
+
+    def setUp(self):
+        self.client.force_login(self.boss)
+
+    def test_brigade_summary_reads_only_the_rollup(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("report_brigade_summary"), {"year": 2025, "month": 6}
+            )
+
+        self.assertFalse(any("core_timesheet" in q["sql"] for q in queries))
+        rows = {row["worker__brigade__name"]: row for row in response.context["rows"]}
+        self.assertEqual(rows["Brygada Testowa"]["total_hours"], 56)
+        self.assertEqual(rows["Brygada Testowa"]["workers"], 2)
+        self.assertEqual(rows["Brygada Druga"]["total_hours"], 40)
+
+    def test_worker_payroll_for_year(self):
+        response = self.client.get(
+            reverse("report_worker_payroll"), {"year": 2025, "q": "kowalski00"}
+        )
+
+        self.assertEqual(
+            [
+                (row["worker_id"], row["days_worked"], row["total_hours"])
+                for row in response.context["rows"]
+            ],
+            [(self.workers[0].id, 15, 120)],
+        )
+
+    def test_reports_are_for_szef_only(self):
+        self.client.force_login(self.foreman)
+
+        response = self.client.get(reverse("report_worker_payroll"))
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ExportTimesheetsTests(TimesheetTestMixin, TestCase):
+    worker_count = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.boss = User.objects.create_user(username="szef", role=User.Role.SZEF)
+
+    def setUp(self):
+        self.client.force_login(self.boss)
+
+    def test_view_streams_month_rows(self):
+        first, second = self.workers
+        self.fill_month(2025, 6, [2, 3], hours=8)
+        TimeSheet.objects.create(worker=first, date=date(2025, 6, 4), hours_worked=0)
+        TimeSheet.objects.create(worker=first, date=date(2025, 7, 1), hours_worked=5)
+
+        response = self.client.get(
+            reverse("export_timesheets"), {"year": 2025, "month": 6}
+        )
+
+        self.assertTrue(response.streaming)
+        rows = list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(rows[0][:5], ["Brygada", "Pracownik", "Rok", "Miesiąc", "1"])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][:4], ["Brygada Testowa", str(first), "2025", "6"])
+        self.assertEqual(rows[1][4:8], ["", "8", "8", "0"])
+        # Same days worked and total as the payroll report.
+        self.assertEqual(rows[1][-2:], ["2", "16"])
+        self.assertEqual(rows[2][-2:], ["2", "16"])
+
+    def test_workers_without_brigade_exported(self):
+        loner = Worker.objects.create(first_name="Adam", last_name="Nowak")
+        self.fill_month(2025, 6, [2], hours=8)
+        TimeSheet.objects.create(worker=loner, date=date(2025, 6, 2), hours_worked=6)
+        ArchivedMonth.objects.create(
+            worker=loner, year=2025, month=5, hours=pack_month({1: 4})
+        )
+
+        rows = list(timesheet_rows())
+
+        self.assertEqual(
+            [row[:4] + row[-2:] for row in rows[1:3]],
+            [["", str(loner), 2025, 5, 1, 4], ["", str(loner), 2025, 6, 1, 6]],
+        )
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(len(list(timesheet_rows(brigade_id=self.brigade.id))), 3)
+
+    def test_years_out_of_range_fall_back_to_current(self):
+        for year in ("0", "9999", "10000"):
+            response = self.client.get(reverse("export_timesheets"), {"year": year})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(
+                f"ewidencja-{date.today().year}.csv", response["Content-Disposition"]
+            )
+
+    def test_command_exports_every_month(self):
+        self.fill_month(2025, 5, [1], hours=8)
+        self.fill_month(2025, 6, [1], hours=6)
+        output = StringIO()
+
+        call_command("export_timesheets", "--start", "2025-06", stdout=output)
+
+        rows = list(csv.reader(output.getvalue().splitlines()))
+        self.assertEqual([row[3] for row in rows[1:]], ["6", "6"])
+
+
+class ImportTimesheetsTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.boss = User.objects.create_user(username="szef", role=User.Role.SZEF)
+        # Two workers share this name, so rows naming them are ambiguous.
+        Worker.objects.create(first_name="Adam", last_name="Nowak")
+        Worker.objects.create(first_name="Adam", last_name="Nowak")
+
+    def setUp(self):
+        self.client.force_login(self.boss)
+
+    def csv_file(self, *rows):
+        header = "Brygada,Pracownik,Rok,Miesiąc," + ",".join(map(str, range(1, 32)))
+        lines = [header] + [",".join(row + [""] * (35 - len(row))) for row in rows]
+        return "\n".join(lines) + "\n"
+
+    def test_upload_saves_valid_rows_and_reports_rejected(self):
+        first, second, third = self.workers
+        content = self.csv_file(
+            ["B", str(first), "2025", "6", "8", "", "7"],
+            ["B", "jan01  KOWALSKI01", "2025", "6", "", "6"],
+            ["B", "Nieznany Ktoś", "2025", "6", "8"],
+            ["B", "Adam Nowak", "2025", "6", "8"],
+            ["B", str(third), "2025", "6", "8", "x"],
+            ["B", str(third), "2025", "2", *["8"] * 30],
+            ["B", str(third), "2025", "13", "8"],
+            ["B", str(third), "0", "1", "8"],
+            ["B", str(third), "10000", "1", "8"],
+            ["B", str(third), "2025", "6", "²"],
+        )
+        upload = SimpleUploadedFile("godziny.csv", content.encode())
+
+        response = self.client.post(reverse("import_timesheets"), {"file": upload})
+
+        self.assertEqual(response.context["saved"], 3)
+        self.assertEqual(
+            response.context["rejected"],
+            [
+                (4, "Nieznany pracownik"),
+                (5, "Niejednoznaczny pracownik"),
+                (6, "Nieprawidłowe godziny w dniu 2"),
+                (7, "Dzień 29 poza miesiącem"),
+                (8, "Nieprawidłowy rok lub miesiąc"),
+                (9, "Nieprawidłowy rok lub miesiąc"),
+                (10, "Nieprawidłowy rok lub miesiąc"),
+                (11, "Nieprawidłowe godziny w dniu 1"),
+            ],
+        )
+        self.assertEqual(
+            set(
+                TimeSheet.objects.values_list("worker_id", "date__day", "hours_worked")
+            ),
+            {(first.id, 1, 8), (first.id, 3, 7), (second.id, 2, 6)},
+        )
+        self.assertEqual(
+            MonthlyHours.objects.get(worker=first, year=2025, month=6).total_hours, 15
+        )
+
+    def test_non_utf8_upload_reported(self):
+        content = self.csv_file(["B", "Jan Zieliński", "2025", "6", "8"])
+        upload = SimpleUploadedFile("godziny.csv", content.encode("cp1250"))
+
+        response = self.client.post(reverse("import_timesheets"), {"file": upload})
+
+        self.assertContains(response, "Plik nie jest zapisany w kodowaniu UTF-8.")
+        self.assertNotIn("imported", response.context)
+        self.assertFalse(TimeSheet.objects.exists())
+
+    def test_queries_do_not_grow_with_rows(self):
+        content = self.csv_file(
+            *(
+                ["B", str(worker), "2025", str(month), *["8"] * 28]
+                for worker in self.workers
+                for month in range(1, 13)
+            )
+        )
+
+        # worker lookup, payroll locks, savepoint, 4 upsert batches (SQLite binds
+        # at most 999 parameters), rollup sums, archived months and upserts of
+        # 12 months, memberships, release
+        with self.assertNumQueries(1 + 1 + 1 + 4 + 12 * 3 + 1 + 1):
+            saved, rejected = import_timesheets(StringIO(content))
+
+        self.assertEqual((saved, rejected), (3 * 12 * 28, []))
+
+    def test_command_round_trips_export(self):
+        self.fill_month(2025, 6, [2, 3], hours=8)
+        exported = StringIO()
+        call_command("export_timesheets", stdout=exported)
+        TimeSheet.objects.all().delete()
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(exported.getvalue())
+        output = StringIO()
+        call_command("import_timesheets", f.name, stdout=output, stderr=StringIO())
+        os.unlink(f.name)
+
+        self.assertIn("Imported 6 entries, rejected 0 rows.", output.getvalue())
+        self.assertEqual(TimeSheet.objects.count(), 6)
+
+
+class SzefDashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.boss = User.objects.create_user(username="szef", role=User.Role.SZEF)
+        cls.brigades = Brigade.objects.bulk_create(
+            Brigade(name=f"Brygada {i:03d}") for i in range(200)
+        )
+        workers = Worker.objects.bulk_create(
+            Worker(first_name="Jan", last_name=f"Kowalski{i:03d}") for i in range(400)
+        )
+        Worker.brigade.through.objects.bulk_create(
+            Worker.brigade.through(worker_id=worker.id, brigade_id=brigade.id)
+            for i, brigade in enumerate(cls.brigades)
+            for worker in workers[2 * i : 2 * i + 2]
+        )
+        first, second = workers[:2]
+        TimeSheet.objects.bulk_create(
+            [
+                # Monday to Wednesday of the month, then the next Monday.
+                TimeSheet(worker=first, date=date(2025, 6, 2), hours_worked=8),
+                TimeSheet(worker=first, date=date(2025, 6, 3), hours_worked=8),
+                TimeSheet(worker=second, date=date(2025, 6, 4), hours_worked=6),
+                TimeSheet(worker=first, date=date(2025, 6, 9), hours_worked=8),
+                # Weekend and last month are not counted.
+                TimeSheet(worker=first, date=date(2025, 6, 7), hours_worked=4),
+                TimeSheet(worker=second, date=date(2025, 5, 30), hours_worked=8),
+            ]
+        )
+
+    def setUp(self):
+        self.client.force_login(self.boss)
+
+    def test_summaries_in_constant_queries(self):
+        # user, brigade summaries
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("szef_dashboard"))
+
+        self.assertEqual(len(response.context["brigades"]), 200)
+
+    def test_summary_values(self):
+        first, second = _get_brigade_summaries(date(2025, 6, 6))[:2]
+
+        self.assertEqual(first.worker_count, 2)
+        self.assertEqual(first.month_hours, 34)
+        # Two workers x five weekdays (2-6 June) minus three filled days.
+        self.assertEqual(first.missing_days, 7)
+        self.assertEqual(second.month_hours, 0)
+        self.assertEqual(second.missing_days, 10)
+
+
+@override_settings(
+    STORAGES={
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": "core.staticfiles.CompressedManifestStaticFilesStorage"
+        },
+    }
+)
+class StaticAssetsTests(TimesheetTestMixin, TestCase):
+    worker_count = 2
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(root.cleanup)
+        cls.static_root = root.name
+
+        cls.enterClassContext(override_settings(STATIC_ROOT=root.name))
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    def asset_urls(self, response):
+        html = response.content.decode()
+        return re.findall(r'<(?:link|script)[^>]* (?:href|src)="([^"]+)"', html)
+
+    def test_pages_make_no_external_requests(self):
+        boss = User.objects.create_user(username="szef", role=User.Role.SZEF)
+        pages = [self.client.get(reverse("dashboard"))]
+        self.client.force_login(boss)
+        pages.append(self.client.get(reverse("dashboard")))
+        self.client.logout()
+        pages.append(self.client.get(reverse("login")))
+
+        for page in pages:
+            urls = self.asset_urls(page)
+            self.assertGreaterEqual(len(urls), 4, urls)
+            for url in urls:
+                self.assertTrue(url.startswith(settings.STATIC_URL), url)
+                self.assertRegex(url, HASHED_NAME_RE)
+                path = os.path.join(self.static_root, url[len(settings.STATIC_URL) :])
+                self.assertTrue(os.path.isfile(path), url)
+                self.assertTrue(os.path.isfile(path + ".gz"), url)
+
+    def test_hashed_files_served_compressed_and_cached_for_good(self):
+        [css_url] = [
+            url
+            for url in self.asset_urls(self.client.get(reverse("dashboard")))
+            if "bootstrap" in url and url.endswith(".css")
+        ]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(css_url, HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+        content = gzip.decompress(b"".join(response.streaming_content))
+        with open(finders.find("vendor/bootstrap/bootstrap.min.css"), "rb") as f:
+            self.assertEqual(content, f.read())
+
+        plain = self.client.get(css_url)
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(self.client.get("/static/../manage.py").status_code, 404)
+
+    def test_missing_vendored_files(self):
+        missing = override_settings(
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+            STATICFILES_DIRS=[],
+        )
+        is_vendored.cache_clear()
+        self.addCleanup(is_vendored.cache_clear)
+
+        with missing:
+            errors = check_vendored_assets(None)
+            with override_settings(DEBUG=True):
+                debug_errors = check_vendored_assets(None)
+                html = render_to_string("base.html")
+
+        # Outside DEBUG collectstatic stops instead of pages using the CDN.
+        self.assertEqual([error.id for error in errors], ["core.E001"] * 2)
+        self.assertEqual(debug_errors, [])
+        url, integrity = VENDOR_ASSETS["vendor/bootstrap/bootstrap.min.css"]
+        self.assertIn(f'href="{url}" integrity="{integrity}"', html)
+
+
+class SqliteProfileTests(TestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        with connection.cursor() as cursor:
+            synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+            busy_timeout = cursor.execute("PRAGMA busy_timeout").fetchone()[0]
+
+        self.assertEqual(synchronous, 1)  # NORMAL
+        self.assertEqual(busy_timeout, 20000)
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+
+
+class ConcurrentWriterTests(TransactionTestCase):
+    def test_concurrent_saves_never_hit_locked_database(self):
+        # Foremen saving at once, each thread with its own connection.
+        result = concurrent_saves(writers=4, saves=20)
+
+        self.assertEqual(result["journal_mode"], "wal")
+        self.assertEqual(result["lock_errors"], 0)
+        self.assertEqual(result["saved"], 4 * 20)
+
+
+class RequestTimingTests(TimesheetTestMixin, TestCase):
+    worker_count = 3
+
+    def setUp(self):
+        super().setUp()
+        recent_requests.clear()
+
+    def test_server_timing_header(self):
+        url = reverse("dashboard_by_date", kwargs={"year": 2025, "month": 6})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_HX_REQUEST="true")
+
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        self.assertIn('desc="htmx"', timing)
+        self.assertRegex(timing, r"tpl;dur=\d+\.\d")
+
+        kind, view, _, query_count, _, template_ms = recent_requests[-1]
+        self.assertEqual((kind, view, query_count), ("htmx", "dashboard_by_date", 5))
+        self.assertGreater(template_ms, 0)
+
+    def test_full_page_tagged_separately(self):
+        self.client.get(reverse("dashboard"))
+        self.client.get(reverse("dashboard"), HTTP_HX_REQUEST="true")
+
+        self.assertEqual([entry[0] for entry in recent_requests], ["page", "htmx"])
+
+    @override_settings(PERF_SLOW_REQUEST_MS=0)
+    def test_slow_requests_logged(self):
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            self.client.get(reverse("dashboard"))
+
+        self.assertIn("Slow page request GET /dashboard/ (dashboard)", logs.output[0])
+
+    def test_summary_page_for_staff_only(self):
+        self.client.get(reverse("dashboard"))
+        self.assertEqual(
+            self.client.get(reverse("performance_summary")).status_code, 403
+        )
+
+        self.foreman.is_staff = True
+        self.foreman.save()
+        response = self.client.get(reverse("performance_summary"))
+
+        self.assertContains(response, "<td>dashboard</td>")
+        rows = {row["view"]: row for row in response.context["rows"]}
+        self.assertEqual(rows["dashboard"]["count"], 1)
+
+
+class BenchmarkSupportTests(TestCase):
+    def test_seed_load(self):
+        call_command(
+            "seed_load", brigades=2, workers=3, years=1, prefix="t", stdout=StringIO()
+        )
+
+        self.assertEqual(Brigade.objects.filter(name__startswith="t").count(), 2)
+        self.assertEqual(Worker.objects.filter(brigade__isnull=False).count(), 6)
+        # About 260 weekdays a year for each of the six workers.
+        self.assertGreater(TimeSheet.objects.count(), 6 * 250)
+        self.assertEqual(
+            MonthlyHours.objects.aggregate(total=Sum("total_hours"))["total"],
+            TimeSheet.objects.aggregate(total=Sum("hours_worked"))["total"],
+        )
+        with self.assertRaises(CommandError):
+            call_command("seed_load", brigades=1, prefix="t", stdout=StringIO())
+
+    def test_regressions_beyond_tolerance(self):
+        baseline = {
+            "hot_paths": {
+                "small": {
+                    "save_hours": {"best_ms": 1.0, "median_ms": 10.0},
+                    "table_body": {"best_ms": 1.0, "median_ms": 10.0},
+                }
+            },
+            "htmx_load": {"wsgi": {"total_ms": 100.0}},
+        }
+        results = {
+            "hot_paths": {
+                "small": {
+                    "save_hours": {"best_ms": 5.0, "median_ms": 12.0},
+                    "table_body": {"best_ms": 1.0, "median_ms": 13.0},
+                    "bulk_save_hours": {"median_ms": 99.0},
+                }
+            },
+            "htmx_load": {"wsgi": {"total_ms": 90.0}},
+        }
+
+        self.assertEqual(
+            regressions(results, baseline, 0.25),
+            [("hot_paths.small.table_body.median_ms", 10.0, 13.0)],
+        )
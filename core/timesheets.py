@@ -0,0 +1,231 @@
+from datetime import date
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from core.models import ArchivedMonth, MonthlyHours, PayrollPeriod, TimeSheet
+
+# Byte of a packed ArchivedMonth day without an entry.
+NO_ENTRY = 255
+
+
+def month_range(year: int, month: int) -> tuple[date, date]:
+    """Return the half-open ``[first day, first day of next month)`` range."""
+    if month == 12:
+        return date(year, 12, 1), date(year + 1, 1, 1)
+    return date(year, month, 1), date(year, month + 1, 1)
+
+
+def month_entries(worker_ids, year: int, month: int):
+    """
+    ``(worker_id, day, hours_worked)`` of the workers in one month.
+
+    Filters on a plain date range rather than ``date__year``/``date__month`` so
+    the lookup is an index-only scan of ``ts_worker_date_hours_idx``.
+    """
+    start, end = month_range(year, month)
+    return (
+        TimeSheet.objects.filter(
+            worker_id__in=worker_ids, date__gte=start, date__lt=end
+        )
+        .order_by()
+        .values_list("worker_id", "date__day", "hours_worked")
+    )
+
+
+def pack_month(hours_by_day):
+    """Pack ``{day: hours}`` into the 31 bytes of ``ArchivedMonth.hours``."""
+    data = bytearray([NO_ENTRY] * 31)
+    for day, hours in hours_by_day.items():
+        data[day - 1] = hours
+    return bytes(data)
+
+
+def unpack_month(data):
+    """``{day: hours}`` of a packed ``ArchivedMonth.hours``."""
+    return {
+        day: hours
+        for day, hours in enumerate(bytes(data), start=1)
+        if hours != NO_ENTRY
+    }
+
+
+def can_be_archived(year: int, month: int) -> bool:
+    """Only months before the current one are archived (see ``archive_months``)."""
+    today = date.today()
+    return (year, month) < (today.year, today.month)
+
+
+def archived_months(worker_ids, year: int, month: int):
+    """``(worker_id, packed hours)`` of the workers' archived rows of one month."""
+    if not can_be_archived(year, month):
+        return ArchivedMonth.objects.none()
+    return (
+        ArchivedMonth.objects.filter(worker_id__in=worker_ids, year=year, month=month)
+        .order_by()
+        .values_list("worker_id", "hours")
+    )
+
+
+def clear_archived_days(year: int, month: int, days_by_worker):
+    """
+    Blank ``{worker_id: days}`` in the workers' archived ``year``/``month``, so
+    that a cleared cell does not fall back to its archived hours. Archived rows
+    left without any entry are deleted.
+    """
+    changed, emptied = [], []
+    for worker_id, packed in archived_months(days_by_worker, year, month):
+        data = bytearray(packed)
+        for day in days_by_worker[worker_id]:
+            data[day - 1] = NO_ENTRY
+        if data.count(NO_ENTRY) == len(data):
+            emptied.append(worker_id)
+        elif data != packed:
+            changed.append(
+                ArchivedMonth(worker_id=worker_id, year=year, month=month, hours=data)
+            )
+    if changed:
+        ArchivedMonth.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=["worker", "year", "month"],
+            update_fields=["hours"],
+        )
+    if emptied:
+        ArchivedMonth.objects.filter(
+            worker_id__in=emptied, year=year, month=month
+        ).delete()
+
+
+def locked_periods(year: int, month: int, brigade_ids=(), worker_ids=()):
+    """
+    ``PayrollPeriod`` rows closing ``year``/``month`` for all brigades, one of
+    ``brigade_ids`` or a brigade of one of ``worker_ids``; check with ``exists()``.
+    """
+    scope = Q(brigade__isnull=True)
+    if brigade_ids:
+        scope |= Q(brigade__in=brigade_ids)
+    if worker_ids:
+        scope |= Q(brigade__workers__in=worker_ids)
+    return PayrollPeriod.objects.filter(scope, year=year, month=month)
+
+
+def build_month_grid(workers, year: int, month: int, num_days: int):
+    """
+    Build the worker x day matrix for one month.
+
+    ``workers`` is an ordered iterable of ``Worker`` objects; it is materialized
+    once and the hours are read with a single ``values_list`` query, so the cost
+    does not depend on the number of workers or entries.
+
+    Returns ``(rows, hours_map)`` where every row is
+    ``{"worker": worker, "cells": [(day, hours), ...]}`` with ``None`` for days
+    without an entry, and ``hours_map`` is
+    ``{worker_id: {day: hours_worked}}``.
+    """
+    workers = list(workers)
+    worker_ids = [worker.id for worker in workers]
+
+    # Live rows win over the archived ones of the same day.
+    hours_map = {
+        worker_id: unpack_month(packed)
+        for worker_id, packed in archived_months(worker_ids, year, month)
+    }
+    for worker_id, day, hours_worked in month_entries(worker_ids, year, month):
+        hours_map.setdefault(worker_id, {})[day] = hours_worked
+    return _grid_rows(workers, hours_map, num_days), hours_map
+
+
+async def abuild_month_grid(workers, year: int, month: int, num_days: int):
+    """Async version of ``build_month_grid`` for a ``workers`` queryset."""
+    workers = [worker async for worker in workers]
+    worker_ids = [worker.id for worker in workers]
+
+    hours_map = {
+        worker_id: unpack_month(packed)
+        async for worker_id, packed in archived_months(worker_ids, year, month)
+    }
+    async for worker_id, day, hours_worked in month_entries(worker_ids, year, month):
+        hours_map.setdefault(worker_id, {})[day] = hours_worked
+    return _grid_rows(workers, hours_map, num_days), hours_map
+
+
+def _grid_rows(workers, hours_map, num_days):
+    days = range(1, num_days + 1)
+    rows = []
+    for worker in workers:
+        worker_hours = hours_map.get(worker.id, {})
+        rows.append(
+            {
+                "worker": worker,
+                "cells": [(day, worker_hours.get(day)) for day in days],
+            }
+        )
+    return rows
+
+
+def monthly_totals(timesheets):
+    """Annotate ``timesheets`` with per worker and month ``total_hours``/``days_worked``."""
+    return (
+        timesheets.order_by()
+        .values("worker_id", year=ExtractYear("date"), month=ExtractMonth("date"))
+        .annotate(
+            total_hours=Sum("hours_worked"),
+            days_worked=Count("id", filter=Q(hours_worked__gt=0)),
+        )
+    )
+
+
+def save_monthly_hours(totals, batch_size=None):
+    """Upsert ``MonthlyHours`` rows from ``monthly_totals()`` dicts."""
+    MonthlyHours.objects.bulk_create(
+        (MonthlyHours(**row) for row in totals),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["worker", "year", "month"],
+        update_fields=["total_hours", "days_worked"],
+    )
+
+
+def refresh_monthly_hours(worker_ids, months):
+    """Recompute the ``MonthlyHours`` rollup of the workers in ``months``."""
+    worker_ids = list(worker_ids)
+    for year, month in months:
+        start, end = month_range(year, month)
+        totals = list(
+            monthly_totals(
+                TimeSheet.objects.filter(
+                    worker_id__in=worker_ids, date__gte=start, date__lt=end
+                )
+            )
+        )
+        totals = _with_archived_totals(totals, worker_ids, year, month)
+        save_monthly_hours(totals)
+        # Workers whose last entry of the month was just removed.
+        MonthlyHours.objects.filter(
+            worker_id__in=set(worker_ids) - {row["worker_id"] for row in totals},
+            year=year,
+            month=month,
+        ).delete()
+
+
+def _with_archived_totals(totals, worker_ids, year, month):
+    """Replace the live-only ``totals`` of workers with an archived month."""
+    archived = {
+        worker_id: unpack_month(packed)
+        for worker_id, packed in archived_months(worker_ids, year, month)
+    }
+    if not archived:
+        return totals
+    for worker_id, day, hours in month_entries(list(archived), year, month):
+        archived[worker_id][day] = hours
+    return [row for row in totals if row["worker_id"] not in archived] + [
+        {
+            "worker_id": worker_id,
+            "year": year,
+            "month": month,
+            "total_hours": sum(days.values()),
+            "days_worked": sum(1 for hours in days.values() if hours > 0),
+        }
+        for worker_id, days in archived.items()
+    ]
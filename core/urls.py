@@ -9,12 +9,12 @@ urlpatterns = [
         "dashboard/<int:year>/<int:month>/", views.dashboard, name="dashboard_by_date"
     ),
     # HTMX
+    path("save-hours/<int:worker_id>/", views.save_hours, name="save_hours"),
     path(
-        "get-edit-form/<int:worker_id>/<int:year>/<int:month>/<int:day>/",
-        views.get_edit_form,
-        name="get_edit_form",
+        "save-hours-batch/<int:year>/<int:month>/",
+        views.save_hours_batch,
+        name="save_hours_batch",
     ),
-    path("save-hours/<int:worker_id>/", views.save_hours, name="save_hours"),
     path(
         "bulk-save-hours/<int:year>/<int:month>",
         views.bulk_save_hours,
@@ -25,6 +25,11 @@ urlpatterns = [
         views.get_bulk_edit_form,
         name="get_bulk_edit_form",
     ),
+    path(
+        "timesheet-events/<int:year>/<int:month>/",
+        views.timesheet_events,
+        name="timesheet_events",
+    ),
     # TODO dummy data
     path("szef-dashboard/", views.szef_dashboard_view, name="szef_dashboard"),
     path("manage/workers/", views.manage_workers_view, name="manage_workers"),
@@ -35,6 +40,11 @@ urlpatterns = [
         name="assign_workers",
     ),
     path("finance/ledger/", views.financial_ledger_view, name="financial_ledger"),
+    path(
+        "finance/payroll-periods/",
+        views.payroll_periods_view,
+        name="payroll_periods",
+    ),
     path(
         "reports/brigade-summary/",
         views.report_brigade_summary_view,
@@ -45,4 +55,7 @@ urlpatterns = [
         views.report_worker_payroll_view,
         name="report_worker_payroll",
     ),
+    path("reports/export/", views.export_timesheets_view, name="export_timesheets"),
+    path("reports/import/", views.import_timesheets_view, name="import_timesheets"),
+    path("performance/", views.performance_summary_view, name="performance_summary"),
 ]
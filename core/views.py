@@ -1,13 +1,80 @@
 import calendar
+import csv
+import hashlib
+import io
+import re
 from datetime import date, timedelta
+from functools import reduce
+from operator import or_
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, FilteredRelation, Prefetch, Q, Sum
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
-
-from core.models import TimeSheet, Worker
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.safestring import mark_safe
+
+from core.brigades import change_brigade_workers
+from core.cache import (
+    abrigade_worker_ids,
+    acached_table,
+    atable_version,
+    brigade_worker_ids,
+    invalidate_months,
+)
+from core.events import apublish_cells, event_stream, publish_cells, timesheet_channel
+from core.exports import csv_lines, timesheet_rows
+from core.imports import import_timesheets
+from core.instrumentation import recent_requests, summarize
+from core.models import (
+    Brigade,
+    FrozenTimesheet,
+    MonthlyHours,
+    PayrollPeriod,
+    TimeSheet,
+    Worker,
+)
+from core.signals import timesheets_changed
+from core.timesheets import (
+    abuild_month_grid,
+    archived_months,
+    build_month_grid,
+    clear_archived_days,
+    locked_periods,
+    month_range,
+    unpack_month,
+)
+
+POLISH_MONTHS = [
+    (1, "Styczeń"),
+    (2, "Luty"),
+    (3, "Marzec"),
+    (4, "Kwiecień"),
+    (5, "Maj"),
+    (6, "Czerwiec"),
+    (7, "Lipiec"),
+    (8, "Sierpień"),
+    (9, "Wrzesień"),
+    (10, "Październik"),
+    (11, "Listopad"),
+    (12, "Grudzień"),
+]
+
+BATCH_CELL_RE = re.compile(r"^h-(?P<worker_id>\d+)-(?P<day>\d+)$")
+
+WORKERS_PER_PAGE = 50
 
 
 def root_redirect(request):
@@ -25,73 +92,91 @@ def custom_logout_view(request):
     return response
 
 
-def _get_timesheet_context(user, target_date: date):
+async def _auser(request):
+    # Templates read the lazy, synchronous request.user; hand them the user that
+    # was already loaded asynchronously instead of loading it a second time.
+    request.user = await request.auser()
+    return request.user
+
+
+async def _get_timesheet_context(user, target_date: date):
     context = {}
-    polish_months = [
-        (1, "Styczeń"),
-        (2, "Luty"),
-        (3, "Marzec"),
-        (4, "Kwiecień"),
-        (5, "Maj"),
-        (6, "Czerwiec"),
-        (7, "Lipiec"),
-        (8, "Sierpień"),
-        (9, "Wrzesień"),
-        (10, "Październik"),
-        (11, "Listopad"),
-        (12, "Grudzień"),
-    ]
 
-    workers = user.brigade.workers.all().order_by("last_name", "first_name")
-    timesheet_entries = TimeSheet.objects.filter(
-        worker__in=workers, date__year=target_date.year, date__month=target_date.month
+    num_days = calendar.monthrange(target_date.year, target_date.month)[1]
+
+    async def build_table():
+        workers = Worker.objects.filter(brigade=user.brigade_id).order_by(
+            "last_name", "first_name"
+        )
+        rows, hours_map = await abuild_month_grid(
+            workers, target_date.year, target_date.month, num_days
+        )
+        table_context = {
+            "rows": rows,
+            "days": list(range(1, num_days + 1)),
+            "current_month": target_date.month,
+            "current_year": target_date.year,
+        }
+        return {
+            "html": render_to_string("partials/table_body.html", table_context),
+            "hours_map": hours_map,
+        }
+
+    table = await acached_table(
+        user.brigade_id, target_date.year, target_date.month, build_table
     )
 
-    hours_map = {}
-    for entry in timesheet_entries:
-        if entry.worker.id not in hours_map:
-            hours_map[entry.worker.id] = {}
-        hours_map[entry.worker.id][entry.date.day] = entry.hours_worked
+    context.update(_month_navigation(target_date, num_days))
+    context.update(
+        {
+            "table_body": mark_safe(table["html"]),
+            "hours_map": table["hours_map"],
+        }
+    )
+    return context
 
-    num_days = calendar.monthrange(target_date.year, target_date.month)[1]
 
+def _month_navigation(target_date: date, num_days):
     # Prev and next months
     first_day_of_month = target_date.replace(day=1)
     prev_month_date = first_day_of_month - timedelta(days=1)
     next_month_date = first_day_of_month + timedelta(days=num_days)
 
-    context.update(
-        {
-            "workers": workers,
-            "days": list(range(1, num_days + 1)),
-            "hours_map": hours_map,
-            "current_month": target_date.month,
-            "current_month_name": polish_months[target_date.month - 1][1],
-            "current_year": target_date.year,
-            "prev_month": prev_month_date.month,
-            "prev_year": prev_month_date.year,
-            "next_month": next_month_date.month,
-            "next_year": next_month_date.year,
-            "months_list": polish_months,
-        }
+    return {
+        "days": list(range(1, num_days + 1)),
+        "current_month": target_date.month,
+        "current_month_name": POLISH_MONTHS[target_date.month - 1][1],
+        "current_year": target_date.year,
+        "prev_month": prev_month_date.month,
+        "prev_year": prev_month_date.year,
+        "next_month": next_month_date.month,
+        "next_year": next_month_date.year,
+        "months_list": POLISH_MONTHS,
+    }
+
+
+def _render_frozen_table(brigade_id, year, month):
+    """Read-only timesheet of a closed month, rendered once when it is locked."""
+    num_days = calendar.monthrange(year, month)[1]
+    workers = Worker.objects.filter(brigade=brigade_id).order_by(
+        "last_name", "first_name"
     )
-    return context
+    rows, _ = build_month_grid(workers, year, month, num_days)
+    for row in rows:
+        row["total"] = sum(hours for _, hours in row["cells"] if hours)
+    context = {"rows": rows, **_month_navigation(date(year, month, 1), num_days)}
+    return render_to_string("partials/timesheet_frozen.html", context)
 
 
 @login_required
-def dashboard(request, year=None, month=None):
+async def dashboard(request, year=None, month=None):
     context = {}
-    user = request.user
+    user = await _auser(request)
 
     if user.role == "SZEF":
-        # TODO szef
-        context["brigades"] = [
-            {"id": 1, "name": "Brygada A (Test)"},
-            {"id": 2, "name": "Brygada B (Przykładowa)"},
-        ]
-        pass
+        context["brigades"] = await sync_to_async(_get_brigade_summaries)(date.today())
 
-    if user.role == "BRYGADZISTA" and user.brigade:
+    if user.role == "BRYGADZISTA" and user.brigade_id:
         target_date = None
         if year and month:
             target_date = date(year, month, 1)
@@ -103,110 +188,426 @@ def dashboard(request, year=None, month=None):
         if target_date is None:
             target_date = date.today()
 
-        context.update(_get_timesheet_context(user, target_date))
+        etag = _grid_etag(
+            request,
+            user,
+            target_date,
+            await atable_version(user.brigade_id, target_date.year, target_date.month),
+        )
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return _revalidated(not_modified, etag)
+
+        frozen = await (
+            FrozenTimesheet.objects.filter(
+                brigade=user.brigade_id,
+                period__year=target_date.year,
+                period__month=target_date.month,
+            )
+            .values_list("html", flat=True)
+            .afirst()
+        )
+        if frozen is None:
+            context.update(await _get_timesheet_context(user, target_date))
+        elif request.htmx:
+            return _revalidated(HttpResponse(frozen), etag)
+        else:
+            context["frozen_table"] = mark_safe(frozen)
+        context["etag"] = etag
 
+    # The page templates follow user.brigade, a lazy query: render off the loop.
     if request.htmx:
-        return render(request, "partials/timesheet_wrapper.html", context)
+        response = await sync_to_async(render)(
+            request, "partials/timesheet_wrapper.html", context
+        )
     else:
-        return render(request, "core/dashboard.html", context)
+        response = await sync_to_async(render)(request, "core/dashboard.html", context)
+    if "etag" in context:
+        _revalidated(response, context["etag"])
+    return response
 
 
-@login_required
-def get_edit_form(request, worker_id, year, month, day):
-    worker = get_object_or_404(Worker, pk=worker_id)
-    current_date = date(year, month, day)
-
-    timesheet_entry = TimeSheet.objects.filter(worker=worker, date=current_date).first()
-    hours = timesheet_entry.hours_worked if timesheet_entry else ""
+def _grid_etag(request, user, target_date, version):
+    """
+    ETag of a foreman's month: the table version plus what else the response
+    depends on, i.e. the user, the CSRF secret in the page and partial vs page.
+    The full page also shows the user's name, role and brigade name, which come
+    with the cached user.
+    """
+    if request.htmx:
+        kind = "htmx"
+    else:
+        brigade_name = user.brigade.name if user.brigade_id else ""
+        kind = f"page:{user.get_username()}:{user.role}:{brigade_name}"
+    csrf_secret = request.META.get("CSRF_COOKIE", "")
+    key = f"{user.pk}:{csrf_secret}:{kind}:{target_date:%Y-%m}:{version}"
+    return f'"{hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def _revalidated(response, etag):
+    """Make the browser check the grid's ``etag`` before every reuse."""
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["HX-Request"])
+    return response
 
-    context = {"worker": worker, "date_str": current_date.isoformat(), "hours": hours}
 
-    return render(request, "partials/edit_hours_form.html", context)
+async def _aworker_in_scope(user, worker_id):
+    """
+    Whether ``user`` may edit the worker's hours: any worker for the Szef, only
+    members of their own brigade for a foreman. The foreman's check reads the
+    cached membership, so it costs no query.
+    """
+    if user.role == "SZEF":
+        return await Worker.objects.filter(pk=worker_id).aexists()
+    if not user.brigade_id:
+        return False
+    return worker_id in await abrigade_worker_ids(user.brigade_id)
+
+
+@sync_to_async
+def _clear_cell(worker_id, entry_date):
+    """Delete the worker's entry of the day, live or archived."""
+    with transaction.atomic():
+        cleared = TimeSheet.objects.filter(worker_id=worker_id, date=entry_date)
+        cleared._raw_delete(cleared.db)
+        clear_archived_days(
+            entry_date.year, entry_date.month, {worker_id: [entry_date.day]}
+        )
+        timesheets_changed.send(
+            sender=TimeSheet,
+            worker_ids=[worker_id],
+            months=[(entry_date.year, entry_date.month)],
+        )
 
 
 @login_required
-def save_hours(request, worker_id):
+async def save_hours(request, worker_id):
     if request.method == "POST":
-        worker = get_object_or_404(Worker, pk=worker_id)
+        if not await _aworker_in_scope(await _auser(request), worker_id):
+            raise Http404
         entry_date_str = request.POST.get("date")
         hours_str = request.POST.get("hours")
 
         entry_date = date.fromisoformat(entry_date_str)
+        if await locked_periods(
+            entry_date.year, entry_date.month, worker_ids=[worker_id]
+        ).aexists():
+            return HttpResponse("Miesiąc zamknięty", status=403)
 
         if hours_str and hours_str.strip():
             try:
                 hours = int(hours_str)
-                obj, created = TimeSheet.objects.update_or_create(
-                    worker=worker, date=entry_date, defaults={"hours_worked": hours}
+                obj, created = await TimeSheet.objects.aupdate_or_create(
+                    worker_id=worker_id,
+                    date=entry_date,
+                    defaults={"hours_worked": hours},
                 )
             except (ValueError, TypeError):
-                obj = TimeSheet.objects.filter(worker=worker, date=entry_date).first()
+                obj = await TimeSheet.objects.filter(
+                    worker_id=worker_id, date=entry_date
+                ).afirst()
         else:
-            TimeSheet.objects.filter(worker=worker, date=entry_date).delete()
+            await _clear_cell(worker_id, entry_date)
             obj = None
 
         context = {
-            "worker": worker,
+            "worker_id": worker_id,
             "day": entry_date.day,
             "current_month": entry_date.month,
             "current_year": entry_date.year,
-            "hours": obj.hours_worked if obj and obj.hours_worked > 0 else "-",
+            "hours": obj.hours_worked if obj else None,
         }
+        await apublish_cells(
+            [(worker_id, entry_date.day, context["hours"])],
+            entry_date.year,
+            entry_date.month,
+        )
         return render(request, "partials/timesheet_cell.html", context)
 
     return HttpResponse(status=405)
 
 
+def _parse_batch_cells(data, num_days):
+    """
+    Read ``h-<worker_id>-<day>`` fields into ``{(worker_id, day): hours}``.
+
+    Blank values map to ``None`` (clear the cell); unparsable or negative values
+    and days outside the month are skipped.
+    """
+    cells = {}
+    for key, value in data.items():
+        match = BATCH_CELL_RE.match(key)
+        if not match:
+            continue
+        worker_id, day = int(match["worker_id"]), int(match["day"])
+        if not 1 <= day <= num_days:
+            continue
+        if not value.strip():
+            cells[worker_id, day] = None
+            continue
+        try:
+            hours = int(value)
+        except ValueError:
+            continue
+        if hours >= 0:
+            cells[worker_id, day] = hours
+    return cells
+
+
+@login_required
+def save_hours_batch(request, year, month):
+    """Save many changed cells of one month in a single request and transaction."""
+    if request.method != "POST":
+        return HttpResponse(status=405)
+
+    user = request.user
+    if user.role != "SZEF" and not user.brigade_id:
+        return HttpResponse("Brak brygady lub roli", status=403)
+    num_days = calendar.monthrange(year, month)[1]
+    cells = _parse_batch_cells(request.POST, num_days)
+
+    requested_ids = {worker_id for worker_id, _ in cells}
+    if user.role == "SZEF":
+        allowed_ids = set(
+            Worker.objects.filter(id__in=requested_ids).values_list("id", flat=True)
+        )
+    else:
+        allowed_ids = requested_ids.intersection(brigade_worker_ids(user.brigade_id))
+    cells = {key: hours for key, hours in cells.items() if key[0] in allowed_ids}
+    if cells and locked_periods(year, month, worker_ids=allowed_ids).exists():
+        return HttpResponse("Miesiąc zamknięty", status=403)
+
+    to_save = [
+        TimeSheet(worker_id=worker_id, date=date(year, month, day), hours_worked=hours)
+        for (worker_id, day), hours in cells.items()
+        if hours is not None
+    ]
+    to_clear, cleared_days = {}, {}
+    for (worker_id, day), hours in cells.items():
+        if hours is None:
+            to_clear.setdefault(day, []).append(worker_id)
+            cleared_days.setdefault(worker_id, []).append(day)
+
+    changed = [
+        (worker_id, day, hours) for (worker_id, day), hours in sorted(cells.items())
+    ]
+    if cells:
+        with transaction.atomic():
+            if to_save:
+                TimeSheet.objects.bulk_create(
+                    to_save,
+                    update_conflicts=True,
+                    unique_fields=["worker", "date"],
+                    update_fields=["hours_worked"],
+                )
+            if to_clear:
+                # Without the per-row TimeSheet signals, timesheets_changed
+                # below covers the whole batch.
+                cleared = TimeSheet.objects.filter(
+                    reduce(
+                        or_,
+                        (
+                            Q(date=date(year, month, day), worker_id__in=worker_ids)
+                            for day, worker_ids in to_clear.items()
+                        ),
+                    )
+                )
+                cleared._raw_delete(cleared.db)
+                clear_archived_days(year, month, cleared_days)
+            timesheets_changed.send(
+                sender=TimeSheet, worker_ids=allowed_ids, months=[(year, month)]
+            )
+            transaction.on_commit(lambda: publish_cells(changed, year, month))
+
+    context = {"cells": changed, "current_year": year, "current_month": month}
+    return render(request, "partials/batch_save_response.html", context)
+
+
 @login_required
-def get_bulk_edit_form(request, day, year, month):
-    context = {"day": day, "year": year, "month": month}
+async def get_bulk_edit_form(request, day, year, month):
+    context = {
+        "day": day,
+        "year": year,
+        "month": month,
+        "num_days": calendar.monthrange(year, month)[1],
+    }
     return render(request, "partials/bulk_edit_form.html", context)
 
 
+@sync_to_async
+def _bulk_write(worker_ids, dates, hours, overwrite, year, month):
+    """
+    Write ``hours`` for the workers on ``dates`` with the rollup refresh in one
+    transaction; returns the ``(worker_id, day, hours)`` cells to send back.
+    """
+    if not (worker_ids and dates):
+        return []
+    # Days of archived months keep their archived hours when filling.
+    archived = (
+        {}
+        if overwrite
+        else {
+            worker_id: unpack_month(packed)
+            for worker_id, packed in archived_months(worker_ids, year, month)
+        }
+    )
+    entries = [
+        TimeSheet(worker_id=worker_id, date=entry_date, hours_worked=hours)
+        for worker_id in worker_ids
+        for entry_date in dates
+        if entry_date.day not in archived.get(worker_id, ())
+    ]
+    with transaction.atomic():
+        if overwrite:
+            TimeSheet.objects.bulk_create(
+                entries,
+                update_conflicts=True,
+                unique_fields=["worker", "date"],
+                update_fields=["hours_worked"],
+            )
+            cells = [(entry.worker_id, entry.date.day, hours) for entry in entries]
+        else:
+            TimeSheet.objects.bulk_create(entries, ignore_conflicts=True)
+            cells = list(
+                TimeSheet.objects.filter(
+                    worker_id__in=worker_ids, date__in=dates
+                ).values_list("worker_id", "date__day", "hours_worked")
+            )
+            live = {(worker_id, day) for worker_id, day, _ in cells}
+            cells += [
+                (worker_id, entry_date.day, days[entry_date.day])
+                for worker_id, days in archived.items()
+                for entry_date in dates
+                if entry_date.day in days and (worker_id, entry_date.day) not in live
+            ]
+        timesheets_changed.send(
+            sender=TimeSheet, worker_ids=worker_ids, months=[(year, month)]
+        )
+        transaction.on_commit(lambda: publish_cells(cells, year, month))
+    return cells
+
+
 @login_required
-def bulk_save_hours(request, year, month):
+async def bulk_save_hours(request, year, month):
+    """
+    Apply one value to every brigade worker on a range of days of the month.
+
+    ``mode=fill`` (the default) only fills days without an entry, ``mode=overwrite``
+    replaces existing ones; ``day_to`` extends the range from ``day`` and
+    ``weekdays`` skips Saturdays and Sundays. The whole range is written with one
+    ``bulk_create`` and only the affected cells are sent back.
+    """
     if not (request.method == "POST" and request.htmx):
         return HttpResponse(status=400)
 
-    user = request.user
-    if not (user.role == "BRYGADZISTA" and user.brigade):
+    user = await _auser(request)
+    if not (user.role == "BRYGADZISTA" and user.brigade_id):
         return HttpResponse("Brak brygady lub roli", status=403)
-
+    # A month closed for another brigade is closed for the workers it shares.
+    worker_ids = await abrigade_worker_ids(user.brigade_id)
+    if await locked_periods(
+        year, month, brigade_ids=[user.brigade_id], worker_ids=worker_ids
+    ).aexists():
+        return HttpResponse("Miesiąc zamknięty", status=403)
+
+    num_days = calendar.monthrange(year, month)[1]
     day = int(request.POST.get("day"))
     hours_str = request.POST.get(f"hours_{day}")
-
-    entry_date = date(year, month, day)
-
-    if hours_str and hours_str.strip():
+    overwrite = request.POST.get("mode") == "overwrite"
+    try:
+        day_to = min(max(int(request.POST.get("day_to") or day), day), num_days)
+    except ValueError:
+        day_to = day
+
+    dates = [date(year, month, d) for d in range(day, day_to + 1)]
+    if request.POST.get("weekdays"):
+        dates = [entry_date for entry_date in dates if entry_date.weekday() < 5]
+
+    cells = []
+    if hours_str and hours_str.strip() and dates:
         try:
             hours_to_apply = int(hours_str)
             if hours_to_apply >= 0:
-                brigade = user.brigade
-
-                workers_without_entry = brigade.workers.exclude(
-                    timesheet__date=entry_date
+                cells = await _bulk_write(
+                    worker_ids, dates, hours_to_apply, overwrite, year, month
                 )
+        except (ValueError, TypeError):
+            pass
 
-                new_entries = [
-                    TimeSheet(
-                        worker=worker, date=entry_date, hours_worked=hours_to_apply
-                    )
-                    for worker in workers_without_entry
-                ]
+    context = {
+        "cells": cells,
+        "day": day,
+        "current_year": year,
+        "current_month": month,
+    }
+    return render(request, "partials/bulk_update_response.html", context)
 
-                if new_entries:
-                    TimeSheet.objects.bulk_create(new_entries, ignore_conflicts=True)
 
-        except (ValueError, TypeError):
-            pass
+@login_required
+async def timesheet_events(request, year, month):
+    """
+    Server-sent events with the cells of the foreman's brigade changed by
+    anyone in the month, for the open grid to swap in.
+    """
+    user = await _auser(request)
+    if not (user.role == "BRYGADZISTA" and user.brigade_id):
+        return HttpResponse("Brak brygady lub roli", status=403)
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be held by the stream for good; 204 tells the
+        # browser not to reconnect.
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        event_stream(timesheet_channel(user.brigade_id, year, month)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
-    target_date = date(year, month, 1)
-    context = _get_timesheet_context(user, target_date)
-    context["day"] = day
 
-    return render(request, "partials/bulk_update_response.html", context)
+def _get_brigade_summaries(today: date):
+    """
+    Every brigade with its worker count, hours of the current month and number of
+    missing days, i.e. weekdays up to ``today`` without an entry, per worker.
 
-    # TODO placeholder views
+    One query regardless of the number of brigades: the month's timesheets are
+    joined through a ``FilteredRelation`` and aggregated per brigade.
+    """
+    start, end = month_range(today.year, today.month)
+    elapsed_weekdays = sum(
+        1 for day in range(1, today.day + 1) if today.replace(day=day).weekday() < 5
+    )
+    brigades = list(
+        Brigade.objects.alias(
+            month_entries=FilteredRelation(
+                "workers__timesheet",
+                condition=Q(
+                    workers__timesheet__date__gte=start,
+                    workers__timesheet__date__lt=end,
+                ),
+            )
+        )
+        .annotate(
+            worker_count=Count("workers", distinct=True),
+            month_hours=Coalesce(Sum("month_entries__hours_worked"), 0),
+            filled_days=Count(
+                "month_entries",
+                filter=Q(
+                    month_entries__date__lte=today,
+                    # Monday to Friday, Django counts weekdays from Sunday = 1.
+                    month_entries__date__week_day__in=[2, 3, 4, 5, 6],
+                ),
+            ),
+        )
+        .order_by("name")
+    )
+    for brigade in brigades:
+        brigade.missing_days = (
+            brigade.worker_count * elapsed_weekdays - brigade.filled_days
+        )
+    return brigades
 
 
 @login_required
@@ -214,26 +615,55 @@ def szef_dashboard_view(request):
     """
     Renders the main navigation dashboard for the Szef.
     """
-    dummy_context = {
-        "brigades": [
-            {"id": 1, "name": "Brygada A (Test)"},
-            {"id": 2, "name": "Brygada B (Przykładowa)"},
-        ]
-    }
-    return render(request, "szef/szef_dashboard.html", dummy_context)
+    context = {"brigades": _get_brigade_summaries(date.today())}
+    return render(request, "szef/szef_dashboard.html", context)
+
+
+def _search_workers(workers, query):
+    """
+    Filter by a ``"last name [first name]"`` prefix search, which the
+    ``worker_name_search_idx`` index serves, and order by name.
+    """
+    last_name, _, first_name = query.partition(" ")
+    if last_name:
+        workers = workers.filter(last_name__istartswith=last_name)
+    if first_name.strip():
+        workers = workers.filter(first_name__istartswith=first_name.strip())
+    return workers.order_by("last_name", "first_name", "id")
+
+
+def _worker_page(request, workers, query_param, page_param):
+    """The requested page of the searched ``workers`` and the search query."""
+    query = " ".join(request.GET.get(query_param, "").split())
+    paginator = Paginator(_search_workers(workers, query), WORKERS_PER_PAGE)
+    return paginator.get_page(request.GET.get(page_param)), query
+
+
+def _posted_ids(request, name):
+    return {int(value) for value in request.POST.getlist(name) if value.isdigit()}
 
 
 @login_required
 def manage_workers_view(request):
-    """Placeholder view for Szef to manage all workers."""
-    dummy_context = {
-        "workers": [
-            {"id": 1, "name": "Jan Kowalski", "rate": 25.00},
-            {"id": 2, "name": "Adam Nowak", "rate": 30.00},
-            {"id": 3, "name": "Piotr Zając (Test)", "rate": 28.50},
-        ]
-    }
-    return render(request, "szef/manage_workers.html", dummy_context)
+    """Searchable, paginated list of all workers; POST adds a new worker."""
+    if request.user.role != "SZEF":
+        return HttpResponse("Brak uprawnień", status=403)
+
+    error = None
+    if request.method == "POST":
+        first_name = request.POST.get("first_name", "").strip()
+        last_name = request.POST.get("last_name", "").strip()
+        if first_name and last_name:
+            Worker.objects.create(first_name=first_name, last_name=last_name)
+            return redirect(request.get_full_path())
+        error = "Podaj imię i nazwisko."
+
+    workers = Worker.objects.prefetch_related(
+        Prefetch("brigade", queryset=Brigade.objects.order_by("name"))
+    )
+    workers, query = _worker_page(request, workers, "q", "page")
+    context = {"workers": workers, "query": query, "error": error}
+    return render(request, "szef/manage_workers.html", context)
 
 
 @login_required
@@ -254,13 +684,45 @@ def manage_foremen_view(request):
 
 @login_required
 def assign_workers_view(request, brigade_id):
-    """Placeholder view for Szef to assign workers to a brigade."""
-    dummy_context = {
-        "brigade_name": f"Brygada A (Test) - ID: {brigade_id}",
-        "assigned_workers": [{"name": "Jan Kowalski"}, {"name": "Adam Nowak"}],
-        "unassigned_workers": [{"name": "Piotr Zając (Test)"}],
+    """
+    Assign workers to a brigade and remove them from it. Both lists are
+    searched and paginated in the database; a POST applies the ticked workers
+    as one diff on the membership table.
+    """
+    if request.user.role != "SZEF":
+        return HttpResponse("Brak uprawnień", status=403)
+    brigade = Brigade.objects.filter(pk=brigade_id).first()
+    if brigade is None:
+        raise Http404
+
+    if request.method == "POST":
+        change_brigade_workers(
+            brigade.id,
+            add=_posted_ids(request, "add"),
+            remove=_posted_ids(request, "remove"),
+        )
+        return redirect(request.get_full_path())
+
+    assigned, assigned_query = _worker_page(
+        request,
+        Worker.objects.filter(brigade=brigade.id),
+        "assigned_q",
+        "assigned_page",
+    )
+    available, available_query = _worker_page(
+        request,
+        Worker.objects.exclude(brigade=brigade.id),
+        "available_q",
+        "available_page",
+    )
+    context = {
+        "brigade": brigade,
+        "assigned": assigned,
+        "assigned_query": assigned_query,
+        "available": available,
+        "available_query": available_query,
     }
-    return render(request, "szef/assign_workers.html", dummy_context)
+    return render(request, "szef/assign_workers.html", context)
 
 
 @login_required
@@ -293,13 +755,195 @@ def financial_ledger_view(request):
     return render(request, "szef/financial_ledger.html", dummy_context)
 
 
+def _report_period(request):
+    """Read ``year`` and an optional ``month`` (empty for the whole year) from GET."""
+    year = request.GET.get("year", "")
+    # The periods are half-open, so the last year needs a following one.
+    year = int(year) if year.isdigit() and 1 <= int(year) < 9999 else date.today().year
+    month = request.GET.get("month", "")
+    month = int(month) if month.isdigit() and 1 <= int(month) <= 12 else None
+    return year, month
+
+
+def _report_context(year, month, rows):
+    return {
+        "rows": rows,
+        "year": year,
+        "month": month,
+        "month_name": POLISH_MONTHS[month - 1][1] if month else None,
+        "months_list": POLISH_MONTHS,
+        "total_hours": sum(row["total_hours"] for row in rows),
+    }
+
+
 @login_required
 def report_brigade_summary_view(request):
-    """Placeholder view for brigade summary report."""
-    return render(request, "szef/report_brigade_summary.html")
+    """Hours per brigade in a month or a year, read from the MonthlyHours rollup."""
+    if request.user.role != "SZEF":
+        return HttpResponse("Brak uprawnień", status=403)
+
+    year, month = _report_period(request)
+    rollup = MonthlyHours.objects.filter(year=year, worker__brigade__isnull=False)
+    if month:
+        rollup = rollup.filter(month=month)
+
+    rows = list(
+        rollup.values("worker__brigade__id", "worker__brigade__name")
+        .annotate(
+            workers=Count("worker", distinct=True),
+            days_worked=Sum("days_worked"),
+            total_hours=Sum("total_hours"),
+        )
+        .order_by("worker__brigade__name")
+    )
+    context = _report_context(year, month, rows)
+    return render(request, "szef/report_brigade_summary.html", context)
 
 
 @login_required
 def report_worker_payroll_view(request):
-    """Placeholder view for individual worker payroll report."""
-    return render(request, "szef/report_worker_payroll.html")
+    """Hours per worker in a month or a year, read from the MonthlyHours rollup."""
+    if request.user.role != "SZEF":
+        return HttpResponse("Brak uprawnień", status=403)
+
+    year, month = _report_period(request)
+    rollup = MonthlyHours.objects.filter(year=year)
+    if month:
+        rollup = rollup.filter(month=month)
+    query = request.GET.get("q", "").strip()
+    if query:
+        rollup = rollup.filter(worker__last_name__istartswith=query)
+
+    rows = list(
+        rollup.values("worker_id", "worker__first_name", "worker__last_name")
+        .annotate(days_worked=Sum("days_worked"), total_hours=Sum("total_hours"))
+        .order_by("worker__last_name", "worker__first_name")
+    )
+    context = _report_context(year, month, rows)
+    context["q"] = query
+    return render(request, "szef/report_worker_payroll.html", context)
+
+
+@login_required
+def import_timesheets_view(request):
+    """Upload a CSV in the export layout and report the rejected rows."""
+    if request.user.role != "SZEF":
+        return HttpResponse("Brak uprawnień", status=403)
+
+    context = {}
+    upload = request.FILES.get("file") if request.method == "POST" else None
+    if upload:
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            saved, rejected = import_timesheets(lines)
+        except UnicodeDecodeError:
+            context["error"] = "Plik nie jest zapisany w kodowaniu UTF-8."
+        except csv.Error as e:
+            context["error"] = f"Nieprawidłowy plik CSV: {e}"
+        else:
+            context.update({"imported": True, "saved": saved, "rejected": rejected})
+    return render(request, "szef/import_timesheets.html", context)
+
+
+@login_required
+def export_timesheets_view(request):
+    """Stream the monthly timesheets of a month or a year as CSV."""
+    if request.user.role != "SZEF":
+        return HttpResponse("Brak uprawnień", status=403)
+
+    year, month = _report_period(request)
+    if month:
+        start, end = month_range(year, month)
+    else:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    brigade_id = request.GET.get("brigade", "")
+    brigade_id = int(brigade_id) if brigade_id.isdigit() else None
+
+    filename = f"ewidencja-{year}" + (f"-{month:02d}" if month else "") + ".csv"
+    return StreamingHttpResponse(
+        csv_lines(timesheet_rows(start, end, brigade_id)),
+        content_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@login_required
+def performance_summary_view(request):
+    """Latency and query costs of the recent requests, per view, for staff."""
+    if not request.user.is_staff:
+        return HttpResponse("Brak uprawnień", status=403)
+    if not recent_requests.maxlen:
+        raise Http404
+
+    context = {"rows": summarize(), "window": recent_requests.maxlen}
+    return render(request, "core/performance_summary.html", context)
+
+
+def _lock_period(year, month, brigade_id, user):
+    """Close a month and render the frozen tables of the brigades it covers."""
+    with transaction.atomic():
+        period = PayrollPeriod.objects.create(
+            year=year, month=month, brigade_id=brigade_id, locked_by=user
+        )
+        if brigade_id:
+            brigade_ids = [brigade_id]
+        else:
+            brigade_ids = list(Brigade.objects.values_list("id", flat=True))
+        FrozenTimesheet.objects.bulk_create(
+            FrozenTimesheet(
+                period=period,
+                brigade_id=frozen_id,
+                html=_render_frozen_table(frozen_id, year, month),
+            )
+            for frozen_id in brigade_ids
+        )
+        # The month's ETags have to change with the table that is served.
+        transaction.on_commit(lambda: invalidate_months(brigade_ids, [(year, month)]))
+    return period
+
+
+@login_required
+def payroll_periods_view(request):
+    """
+    Lock and unlock payroll months. Locked months reject edits and are served
+    from the frozen tables until they are unlocked.
+    """
+    if request.user.role != "SZEF":
+        return HttpResponse("Brak uprawnień", status=403)
+
+    error = None
+    if request.method == "POST" and request.POST.get("unlock"):
+        period = PayrollPeriod.objects.filter(pk=request.POST["unlock"]).first()
+        if period:
+            brigade_ids = list(period.snapshots.values_list("brigade_id", flat=True))
+            # Deleting the period drops its frozen tables too.
+            period.delete()
+            invalidate_months(brigade_ids, [(period.year, period.month)])
+        return redirect("payroll_periods")
+    if request.method == "POST":
+        brigade_id = request.POST.get("brigade", "")
+        brigade_id = int(brigade_id) if brigade_id.isdigit() else None
+        try:
+            year, month = int(request.POST["year"]), int(request.POST["month"])
+            date(year, month, 1)
+        except (KeyError, ValueError):
+            error = "Nieprawidłowy rok lub miesiąc."
+        else:
+            if PayrollPeriod.objects.filter(
+                year=year, month=month, brigade=brigade_id
+            ).exists():
+                error = "Ten miesiąc jest już zamknięty."
+            else:
+                _lock_period(year, month, brigade_id, request.user)
+                return redirect("payroll_periods")
+
+    today = date.today()
+    context = {
+        "periods": PayrollPeriod.objects.select_related("brigade", "locked_by"),
+        "brigades": Brigade.objects.order_by("name"),
+        "months_list": POLISH_MONTHS,
+        "year": today.year,
+        "month": today.month,
+        "error": error,
+    }
+    return render(request, "szef/payroll_periods.html", context)
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.StaticFilesMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -57,13 +58,16 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "core.middleware.RequestTimingMiddleware",
 ]
 
 ROOT_URLCONF = "firma.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time to RequestTimingMiddleware.
+        "BACKEND": "core.instrumentation.TimedDjangoTemplates",
+        "NAME": "django",
         "DIRS": [BASE_DIR / "templates/"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -86,9 +90,78 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # No persistent connections: the app runs under ASGI (async views and the
+        # event streams), where every request's ORM work runs in its own thread
+        # and a kept connection would never be reused or closed. Opening a
+        # SQLite connection is cheap; a WSGI-only deployment may raise this.
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {
+            # Seconds to wait for a competing writer before "database is locked".
+            "timeout": 20,
+            # Take the write lock when a transaction starts, so that concurrent
+            # read-then-write transactions wait instead of failing to upgrade.
+            "transaction_mode": "IMMEDIATE",
+        },
+        # A file, not SQLite's shared in-memory database, so that tests see the
+        # WAL journal and the locking of production (ConcurrentWriterTests).
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
+# Applied to every new SQLite connection (see core.signals.configure_sqlite).
+# WAL lets readers run alongside the single writer; NORMAL is durable in WAL.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 20000,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Both caches have to be shared by all worker processes (e.g. Redis or
+# Memcached) as soon as there is more than one; ``check --deploy`` warns about
+# per-process ones (core.checks).
+CACHES = {
+    # Rendered tables and their per-month versions (core.cache), which are also
+    # the ETags of the grids: a per-process cache keeps serving stale hours from
+    # the processes that did not handle the write.
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "firma",
+    },
+    # Sessions and the logged-in users (core.backends). Kept apart from the
+    # table cache so that large tables never cull them. A per-process cache lets
+    # a logout or a role change only reach the process that handled it.
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "firma-sessions",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Sessions are read from the cache and written through to the database, and
+# only saved when they change.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "sessions"
+SESSION_SAVE_EVERY_REQUEST = False
+
+
+# Request performance measurements (core.middleware.RequestTimingMiddleware)
+
+# Requests slower than this are logged as warnings.
+PERF_SLOW_REQUEST_MS = 500
+# Number of recent requests kept for the summary page, 0 to disable it.
+PERF_SUMMARY_SIZE = 500
+
+
+# Live updates of open timesheet grids (core.events)
+
+# Broker passing changed cells to the event streams. The in-process one only
+# reaches streams of the same process: replace it when running several workers.
+TIMESHEET_EVENTS_BROKER = "core.events.InProcessBroker"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,6 +198,20 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Outside DEBUG static files get content-hashed names and precompressed variants
+# (run collectstatic) and are served by core.middleware.StaticFilesMiddleware.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "core.staticfiles.CompressedManifestStaticFilesStorage"
+        )
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -132,4 +219,5 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "core.User"
+AUTHENTICATION_BACKENDS = ["core.backends.BrigadeModelBackend"]
 LOGIN_REDIRECT_URL = "/dashboard/"